@@ -21,6 +21,9 @@ usage = "usage: %prog [options] <test directory>"
 parser = OptionParser()
 parser.add_option("--cvc", dest="cvc", action="store_true", help="Use the CVC SMT solver instead of Z3", default=False)
 parser.add_option("--z3", dest="cvc", action="store_false", help="Use the Z3 SMT solver")
+parser.add_option("--expr-depth-limit", dest="max_expr_depth", type="int", help="Passed on to pyexz3.py", default=0)
+parser.add_option("--expr-size-limit", dest="max_expr_size", type="int", help="Passed on to pyexz3.py", default=0)
+parser.add_option("--reuse-pool", dest="reuse_pool", type="int", help="Passed on to pyexz3.py", default=0)
 (options, args) = parser.parse_args()
 
 if len(args) == 0 or not os.path.exists(args[0]):
@@ -41,7 +44,10 @@ for f in files:
         full = os.path.join(test_dir, f)
         with open(os.devnull, 'w') as devnull:
             solver = "--cvc" if options.cvc else "--z3"
-            ret = subprocess.call([sys.executable, "pyexz3.py", "--m=25", solver, full], stdout=devnull)
+            limits = ["--expr-depth-limit=%d" % options.max_expr_depth, "--expr-size-limit=%d" % options.max_expr_size]
+            pool = ["--reuse-pool=%d" % options.reuse_pool]
+            ret = subprocess.call([sys.executable, "pyexz3.py", "--m=25", "--start=" + f[:-3], solver] + limits + pool + [full],
+                                  stdout=devnull)
         if (ret == 0):
             myprint(bcolors.SUCCESS, "✓", "Test " + f + " passed.")
         else:
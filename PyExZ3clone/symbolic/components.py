@@ -0,0 +1,44 @@
+# Copyright: see copyright.txt
+
+"""Splitting of path constraints into independent components: two predicates
+belong to the same component iff they are connected through shared variables."""
+
+
+def _find(parent, v):
+    while parent[v] != v:
+        parent[v] = parent[parent[v]]
+        v = parent[v]
+    return v
+
+
+def splitComponents(preds):
+    """Partitions preds into lists of predicates that share no variables with
+    each other (union-find over variable names)."""
+    parent = {}
+    pred_vars = []
+    for p in preds:
+        vs = set(p.getVars())
+        pred_vars.append(vs)
+        for v in vs:
+            parent.setdefault(v, v)
+        vs = list(vs)
+        for v in vs[1:]:
+            a, b = _find(parent, vs[0]), _find(parent, v)
+            if a != b:
+                parent[b] = a
+    components = {}
+    for i, (p, vs) in enumerate(zip(preds, pred_vars)):
+        # a predicate without variables is a component of its own
+        root = _find(parent, next(iter(vs))) if vs else ("const", i)
+        components.setdefault(root, []).append(p)
+    return list(components.values())
+
+
+def queryComponent(asserts, query):
+    """The asserts in the same component as query (its cone of influence).
+    The remaining components are already satisfied by the current concrete
+    inputs and need not be solved again."""
+    for component in splitComponents([query] + list(asserts)):
+        if any(p is query for p in component):
+            return [p for p in component if p is not query]
+    return []
@@ -2,18 +2,24 @@
 
 import logging
 
+from .predicate import Predicate
+
 log = logging.getLogger("se.constraint")
 
 class Constraint:
-	cnt = 0
 	"""A constraint is a list of predicates leading to some specific
-	   position in the code."""
+	   position in the code. Nodes use __slots__ and keep their (at most
+	   two) children in a tuple to stay small on long explorations."""
+	__slots__ = ("inputs", "predicate", "processed", "parent", "children", "site", "id")
+	cnt = 0
+
 	def __init__(self, parent, last_predicate):
 		self.inputs = None
 		self.predicate = last_predicate
 		self.processed = False
 		self.parent = parent
-		self.children = []
+		self.children = ()
+		self.site = None
 		self.id = self.__class__.cnt
 		self.__class__.cnt += 1
 
@@ -27,6 +33,9 @@ class Constraint:
 			return False
 
 	def getAssertsAndQuery(self):
+		"""The solvers look for a counterexample to the query, so the query
+		   is the opposite of this node's predicate, i.e. the branch that the
+		   executions took so far."""
 		self.processed = True
 
 		# collect the assertions
@@ -36,7 +45,7 @@ class Constraint:
 			asserts.append(tmp.predicate)
 			tmp = tmp.parent
 
-		return asserts, self.predicate	       
+		return asserts, Predicate(self.predicate.symtype, not self.predicate.result)
 
 	def getLength(self):
 		if self.parent == None:
@@ -53,14 +62,16 @@ class Constraint:
 		return s
 
 	def findChild(self, predicate):
+		"""Children hold interned predicates (see PredicateTable), so
+		   identity is equality here."""
 		for c in self.children:
-			if predicate == c.predicate:
+			if predicate is c.predicate:
 				return c
 		return None
 
 	def addChild(self, predicate):
 		assert(self.findChild(predicate) is None)
 		c = Constraint(self, predicate)
-		self.children.append(c)
+		self.children = self.children + (c,)
 		return c
 
@@ -0,0 +1,262 @@
+# Copyright: see copyright.txt
+
+import dis
+import logging
+import os
+import sys
+
+log = logging.getLogger("se.coverage")
+
+# conditional jumps across CPython 3.8 - 3.13
+_BRANCH_OPS = {"POP_JUMP_IF_FALSE", "POP_JUMP_IF_TRUE", "POP_JUMP_IF_NONE", "POP_JUMP_IF_NOT_NONE",
+               "POP_JUMP_FORWARD_IF_FALSE", "POP_JUMP_FORWARD_IF_TRUE",
+               "POP_JUMP_BACKWARD_IF_FALSE", "POP_JUMP_BACKWARD_IF_TRUE",
+               "POP_JUMP_FORWARD_IF_NONE", "POP_JUMP_FORWARD_IF_NOT_NONE",
+               "POP_JUMP_BACKWARD_IF_NONE", "POP_JUMP_BACKWARD_IF_NOT_NONE",
+               "JUMP_IF_FALSE_OR_POP", "JUMP_IF_TRUE_OR_POP", "FOR_ITER"}
+
+
+# sys.monitoring tool ids whose locations an execution may have disabled
+_disabled_tools = set()
+
+
+def _popcount(bits):
+    return bin(bits).count("1")
+
+
+class CoverageRecord:
+    """Lines and branch arcs executed by one input, as bitsets (Python ints)
+    over the indices handed out by the collector."""
+    __slots__ = ("lines", "arcs")
+
+    def __init__(self, lines=0, arcs=0):
+        self.lines = lines
+        self.arcs = arcs
+
+    def __or__(self, other):
+        return CoverageRecord(self.lines | other.lines, self.arcs | other.arcs)
+
+
+class CoverageCollector:
+    """Records the lines and branch arcs (source line of a conditional jump ->
+    line it continued at) executed inside the target files during each call of
+    the function under test. Uses PEP 669 sys.monitoring when available, where
+    every location reports at most once per execution, and sys.settrace
+    otherwise. Arcs leaving a function are recorded with a negative
+    destination (-co_firstlineno), as coverage.py does."""
+
+    def __init__(self, filenames):
+        self.files = {os.path.abspath(f) for f in filenames}
+        self.line_index = {}
+        self.arc_index = {}
+        self.records = []
+        self.total = CoverageRecord()
+        self.use_monitoring = hasattr(sys, "monitoring")
+        self._lines = set()
+        self._arcs = set()
+        self._branch_lines = {}
+        self._offset_lines = {}
+        self._seen_branches = {}
+        self._tool = None
+        self._events = []
+        self._disable = True
+        # tracer running around the engine (e.g. coverage.py or pdb), put
+        # back by stop() when the sys.settrace fallback replaced it
+        self._outer_trace = None
+
+    def start(self):
+        self._lines = set()
+        self._arcs = set()
+        self._outer_trace = sys.gettrace()
+        if self.use_monitoring:
+            self._startMonitoring()
+        else:
+            sys.settrace(self._traceCall)
+
+    def stop(self):
+        """Stops recording and returns the CoverageRecord of the execution."""
+        if self.use_monitoring:
+            self._stopMonitoring()
+        else:
+            sys.settrace(self._outer_trace)
+            self._outer_trace = None
+        return self.addExecution(self._lines, self._arcs)
+
+    def close(self):
+        """Releases the sys.monitoring tool id and its callbacks, for the
+        next collector (e.g. of the next exploration) to claim."""
+        if self._tool is None:
+            return
+        mon = sys.monitoring
+        mon.set_events(self._tool, 0)
+        for e in self._events:
+            mon.register_callback(self._tool, e, None)
+        mon.free_tool_id(self._tool)
+        self._tool = None
+
+    def lastExecution(self):
+        """(lines, arcs) of the last execution, as sets of keys."""
+        return self._lines, self._arcs
+
+    def addExecution(self, lines, arcs):
+        """Records an execution from its sets of lines and arcs, e.g. as
+        observed in another process (see sandbox.py)."""
+        self._lines = lines
+        self._arcs = arcs
+        record = CoverageRecord(self._toBits(lines, self.line_index),
+                                self._toBits(arcs, self.arc_index))
+        self.records.append(record)
+        self.total = self.total | record
+        return record
+
+    def getLines(self, record=None):
+        """(filename, line) pairs set in the record (default: all executions)."""
+        return self._fromBits((record or self.total).lines, self.line_index)
+
+    def getArcs(self, record=None):
+        """(filename, from_line, to_line) triples set in the record."""
+        return self._fromBits((record or self.total).arcs, self.arc_index)
+
+    def minimalSuite(self):
+        """Indices of a subset of the executions that covers the same lines
+        and branch arcs as all of them, in execution order. Greedy set
+        cover: repeatedly takes the execution adding the most uncovered
+        arcs (then lines), the earliest on ties."""
+        if not self.records:
+            return []
+        chosen = []
+        arcs = lines = 0
+        left = dict(enumerate(self.records))
+        while arcs != self.total.arcs or lines != self.total.lines:
+            best, gain = None, (0, 0)
+            for i, r in left.items():
+                g = (_popcount(r.arcs & ~arcs), _popcount(r.lines & ~lines))
+                if g > gain:
+                    best, gain = i, g
+            r = left.pop(best)
+            chosen.append(best)
+            arcs |= r.arcs
+            lines |= r.lines
+        # an input is still needed to run a function without lines to cover
+        return sorted(chosen) or [0]
+
+    # -- private
+
+    @staticmethod
+    def _toBits(keys, index):
+        bits = 0
+        for k in keys:
+            i = index.get(k)
+            if i is None:
+                i = index[k] = len(index)
+            bits |= 1 << i
+        return bits
+
+    @staticmethod
+    def _fromBits(bits, index):
+        return {k for k, i in index.items() if bits >> i & 1}
+
+    def _lineOf(self, code, offset):
+        lines = self._offset_lines.get(code)
+        if lines is None:
+            lines = self._offset_lines[code] = {}
+            for start, end, line in code.co_lines():
+                for o in range(start, end, 2):
+                    lines[o] = line
+        return lines.get(offset)
+
+    def _branchLines(self, code):
+        lines = self._branch_lines.get(code)
+        if lines is None:
+            lines = self._branch_lines[code] = {self._lineOf(code, i.offset)
+                                                for i in dis.get_instructions(code)
+                                                if i.opname in _BRANCH_OPS}
+        return lines
+
+    # sys.monitoring (PEP 669)
+
+    def _startMonitoring(self):
+        mon = sys.monitoring
+        if self._tool is None:
+            for tool in (mon.COVERAGE_ID, 4, 5):
+                if mon.get_tool(tool) is None:
+                    mon.use_tool_id(tool, "pyexz3")
+                    self._tool = tool
+                    break
+            else:
+                log.warning("No free sys.monitoring tool id, falling back to sys.settrace")
+                self.use_monitoring = False
+                sys.settrace(self._traceCall)
+                return
+            self._events = [mon.events.LINE]
+            mon.register_callback(self._tool, mon.events.LINE, self._onLine)
+            branch_events = [getattr(mon.events, e) for e in ("BRANCH_LEFT", "BRANCH_RIGHT")
+                             if hasattr(mon.events, e)] or [mon.events.BRANCH]
+            for e in branch_events:
+                mon.register_callback(self._tool, e, self._onBranch)
+                self._events.append(e)
+        # restart_events() re-enables the locations every tool disabled; when
+        # another tool is active, locations of the target files are not
+        # disabled instead, so that its disabled locations stay so
+        self._disable = all(mon.get_tool(t) is None for t in range(6) if t != self._tool)
+        self._seen_branches = {}
+        if self._tool in _disabled_tools:
+            # re-enable the locations disabled during the previous execution
+            mon.restart_events()
+            _disabled_tools.discard(self._tool)
+        if self._disable:
+            _disabled_tools.add(self._tool)
+        events = 0
+        for e in self._events:
+            events |= e
+        mon.set_events(self._tool, events)
+
+    def _stopMonitoring(self):
+        if self._tool is not None:
+            sys.monitoring.set_events(self._tool, 0)
+
+    def _onLine(self, code, line):
+        if code.co_filename not in self.files:
+            return sys.monitoring.DISABLE
+        self._lines.add((code.co_filename, line))
+        if self._disable:
+            return sys.monitoring.DISABLE
+
+    def _onBranch(self, code, offset, destination):
+        if code.co_filename not in self.files:
+            return sys.monitoring.DISABLE
+        src = self._lineOf(code, offset)
+        dst = self._lineOf(code, destination)
+        if dst is None:
+            dst = -code.co_firstlineno
+        self._arcs.add((code.co_filename, src, dst))
+        seen = self._seen_branches.setdefault((code, offset), set())
+        seen.add(dst)
+        # both directions taken: nothing more to learn in this execution
+        if len(seen) > 1 and self._disable:
+            return sys.monitoring.DISABLE
+
+    # sys.settrace fallback
+
+    def _traceCall(self, frame, event, arg):
+        code = frame.f_code
+        fn = code.co_filename
+        if fn not in self.files:
+            return None
+        branch_lines = self._branchLines(code)
+        lines = self._lines
+        arcs = self._arcs
+        last = [None]
+
+        def traceLocal(frame, event, arg):
+            if event == "line":
+                line = frame.f_lineno
+                lines.add((fn, line))
+                if last[0] in branch_lines:
+                    arcs.add((fn, last[0], line))
+                last[0] = line
+            elif event == "return" and last[0] in branch_lines:
+                arcs.add((fn, last[0], -code.co_firstlineno))
+            return traceLocal
+
+        return traceLocal
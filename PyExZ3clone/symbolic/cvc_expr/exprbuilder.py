@@ -1,5 +1,6 @@
 import logging
 
+from symbolic.cvc_expr.expression import CVCExpression
 from symbolic.cvc_expr.integer import CVCInteger
 from symbolic.cvc_expr.string import CVCString
 from symbolic.symbolic_types import SymbolicInteger, SymbolicStr
@@ -15,6 +16,8 @@ class ExprBuilder(object):
         self.solver.guards = []
         self.em = self.solver.getExprManager()
         self.cvc_vars = {}
+        # auxiliary variables of native string encodings
+        self.aux = 0
         self.query = self._toCVC(asserts, query)
 
     def _toCVC(self, asserts, query):
@@ -50,15 +53,26 @@ class ExprBuilder(object):
         return variable
 
     def _wrapIf(self, expr, env):
-        if env is None:
+        if env is None and expr is not None and expr.cvc_expr.getType().isBoolean():
             return expr.ite(CVCInteger.constant(1, self.solver), CVCInteger.constant(0, self.solver))
         else:
             return expr
 
+    def _coerce(self, op, args):
+        """Comparisons are Booleans (see SymbolicBool); as operands of an
+        operator on integers, and compared with one, they count as 1 or 0."""
+        if op in ("and", "or", "not"):
+            return args
+        if op in ("==", "!=") and all(a is not None and a.cvc_expr.getType().isBoolean() for a in args):
+            return args
+        return [self._wrapIf(a, None) for a in args]
+
     def _astToCVCExpr(self, expr, env=None):
         if isinstance(expr, list):
             op = expr[0]
             args = [self._astToCVCExpr(a, env) for a in expr[1:]]
+            if env is None:
+                args = self._coerce(op, args)
             cvc_l = args[0]
             cvc_r = args[1] if len(args) > 1 else None
             cvc_3 = args[2] if len(args) > 2 else None
@@ -94,37 +108,51 @@ class ExprBuilder(object):
                 return cvc_l.find(cvc_r, cvc_3)
             elif op == "str.replace":
                 return cvc_l.replace(cvc_r, cvc_3)
+            elif op == "str.replace_all":
+                return cvc_l.replace_all(cvc_r, cvc_3)
+            elif op == "str.count":
+                return cvc_l.count(cvc_r)
+            elif op == "str.strip":
+                self.aux += 1
+                return cvc_l.strip(expr[2], "__strip%d" % self.aux)
             elif op == "str.startswith":
-                return self._wrapIf(cvc_l.startswith(cvc_r), env)
+                return cvc_l.startswith(cvc_r)
 
             # collection operators
             elif op == "getitem":
                 return cvc_l[cvc_r]
             elif op == "slice":
                 return cvc_l[cvc_r:cvc_3]
-            # equality gets coerced to integer
+            # comparisons are Booleans; no model contains None
             elif op == "==":
                 if cvc_l is None or cvc_r is None:
                     # forces false condition no model contains None
-                    return self._wrapIf(self._astToCVCExpr(0, env) !=
-                                        self._astToCVCExpr(0, env), env)
+                    return self._astToCVCExpr(0, env) != self._astToCVCExpr(0, env)
                 else:
-                    return self._wrapIf((cvc_l == cvc_r), env)
+                    return cvc_l == cvc_r
             elif op == "!=":
                 if cvc_l is None or cvc_r is None:
-                    return self._wrapIf(self._astToCVCExpr(0, env) == self._astToCVCExpr(0, env), env)
+                    return self._astToCVCExpr(0, env) == self._astToCVCExpr(0, env)
                 else:
-                    return self._wrapIf((cvc_l != cvc_r), env)
+                    return cvc_l != cvc_r
             elif op == "<":
-                return self._wrapIf((cvc_l < cvc_r), env)
+                return cvc_l < cvc_r
             elif op == ">":
-                return self._wrapIf((cvc_l > cvc_r), env)
+                return cvc_l > cvc_r
             elif op == "<=":
-                return self._wrapIf((cvc_l <= cvc_r), env)
+                return cvc_l <= cvc_r
             elif op == ">=":
-                return self._wrapIf((cvc_l >= cvc_r), env)
+                return cvc_l >= cvc_r
             elif op == "in":
-                return self._wrapIf((cvc_l.__contains__(cvc_r)), env)
+                return cvc_l.__contains__(cvc_r)
+
+            # connectives of SymbolicBool
+            elif op == "and":
+                return CVCExpression.__and__(cvc_l, cvc_r) if env is None else cvc_l and cvc_r
+            elif op == "or":
+                return CVCExpression.__or__(cvc_l, cvc_r) if env is None else cvc_l or cvc_r
+            elif op == "not":
+                return cvc_l.not_op() if env is None else not cvc_l
             else:
                 utils.crash("Unknown BinOp during conversion from ast to CVC (expressions): %s" % op)
 
@@ -140,7 +168,9 @@ class ExprBuilder(object):
 
         elif isinstance(expr, int) | isinstance(expr, str):
             if env is None:
-                if isinstance(expr, int):
+                if isinstance(expr, bool):
+                    return CVCExpression(self.em.mkBoolConst(expr), self.solver)
+                elif isinstance(expr, int):
                     return CVCInteger.constant(expr, self.solver)
                 elif isinstance(expr, str):
                     return CVCString.constant(expr, self.solver)
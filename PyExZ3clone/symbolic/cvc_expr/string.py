@@ -77,6 +77,44 @@ class CVCString(CVCExpression):
     def replace(self, old, new):
         return CVCString(self.em.mkExpr(CVC4.STRING_STRREPL, self.cvc_expr, old.cvc_expr, new.cvc_expr), self.solver)
 
+    def replace_all(self, old, new):
+        return CVCString(self.em.mkExpr(CVC4.STRING_STRREPLALL, self.cvc_expr, old.cvc_expr, new.cvc_expr), self.solver)
+
+    def count(self, sub):
+        """Occurrences of a non-empty sub: the length removed by replacing
+        them all, divided by the length of sub."""
+        removed = self.len() - self.replace_all(sub, CVCString.constant("", self.solver)).len()
+        n = sub.len()
+        per_occurrence = CVCInteger(self.em.mkExpr(CVC4.INTS_DIVISION, removed.cvc_expr, n.cvc_expr), self.solver)
+        return (n == CVCInteger.constant(0, self.solver)).ite(
+            self.len() + CVCInteger.constant(1, self.solver), per_occurrence)
+
+    def strip(self, chars, name):
+        """The result t of stripping the (concrete) chars, constrained by
+        self == p + t + q, with p and q made of chars and t neither starting
+        nor ending with one of them."""
+        if chars == "":
+            return self
+        p, t, q = [CVCString.variable("%s_%s" % (name, v), self.solver) for v in "ptq"]
+        regexps = [self.em.mkExpr(CVC4.STRING_TO_REGEXP, CVCString.constant(c, self.solver).cvc_expr)
+                   for c in chars]
+        c = regexps[0]
+        for r in regexps[1:]:
+            c = self.em.mkExpr(CVC4.REGEXP_UNION, c, r)
+        star = self.em.mkExpr(CVC4.REGEXP_STAR, c)
+
+        def member(s, regexp):
+            return CVCExpression(self.em.mkExpr(CVC4.STRING_IN_REGEXP, s.cvc_expr, regexp), self.solver)
+
+        zero = CVCInteger.constant(0, self.solver)
+        last = t.len() - CVCInteger.constant(1, self.solver)
+        self.solver.guards.append(self == p + t + q)
+        self.solver.guards.append(member(p, star))
+        self.solver.guards.append(member(q, star))
+        self.solver.guards.append((t.len() == zero) |
+                                  (member(t[zero], c).not_op() & member(t[last], c).not_op()))
+        return t
+
     def startswith(self, prefix):
         return CVCExpression(self.em.mkExpr(CVC4.STRING_PREFIX,
                                             prefix.cvc_expr,
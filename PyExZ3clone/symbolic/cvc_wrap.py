@@ -6,6 +6,7 @@ import CVC4
 from CVC4 import ExprManager, SmtEngine, SExpr
 
 from symbolic.cvc_expr.exprbuilder import ExprBuilder
+from symbolic.components import queryComponent
 
 log = logging.getLogger("se.cvc")
 
@@ -27,10 +28,12 @@ class CVCWrapper(object):
         self.query = None
         self.em = None
         self.solver = None
+        # unsat cores are only extracted by the Z3 backend
+        self.unsat_core = None
 
-    def findCounterexample(self, asserts, query):
+    def findCounterexample(self, asserts, query, constraint_id=None, path_length=None):
         """Tries to find a counterexample to the query while
-           asserts remains valid."""
+           asserts remains valid. Queries are not dumped (see Z3Wrapper)."""
         self.em = ExprManager()
         self.solver = SmtEngine(self.em)
         for name, value in CVCWrapper.options.items():
@@ -73,16 +76,4 @@ class CVCWrapper(object):
 
     @staticmethod
     def _coneOfInfluence(asserts, query):
-        cone = []
-        cone_vars = set(query.getVars())
-        ws = [a for a in asserts if len(set(a.getVars()) & cone_vars) > 0]
-        remaining = [a for a in asserts if a not in ws]
-        while len(ws) > 0:
-            a = ws.pop()
-            a_vars = set(a.getVars())
-            cone_vars = cone_vars.union(a_vars)
-            cone.append(a)
-            new_ws = [a for a in remaining if len(set(a.getVars()) & cone_vars) > 0]
-            remaining = [a for a in remaining if a not in new_ws]
-            ws = ws + new_ws
-        return cone
+        return queryComponent(asserts, query)
@@ -1,98 +1,234 @@
-from collections import deque
 import logging
 import os
 
-from .z3_wrap import Z3Wrapper
+# the solvers (and z3), the portfolio and the optional components are
+# imported where they are first used, to keep the engine cheap to load
+from .results_store import pathKey
 from .path_to_constraint import PathToConstraint
+from .frontier import Frontier
 from .invocation import FunctionInvocation
 from .symbolic_types import symbolic_type, SymbolicType
 import random
 
-# 🔧 Rich import
-from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
-from rich import box
-
-console = Console()
 log = logging.getLogger("se.conc")
 
 # ... [imports and class init stay the same]
 
 class ExplorationEngine:
-    def __init__(self, funcinv, solver="z3"):
+    def __init__(self, funcinv, solver="z3", scheduler=None, coverage=None, limits=None,
+                 eager_terms=False, portfolio_jobs=0, dump_queries=None, reuse_pool=0,
+                 seeds=None, results=None, sandbox=None):
         self.invocation = funcinv
         self.symbolic_inputs = {}
         for n in funcinv.getNames():
             self.symbolic_inputs[n] = funcinv.createArgumentValue(n)
 
-        self.constraints_to_solve = deque([])
+        # optional coverage-guided frontier ordering (see scheduler.py)
+        self.scheduler = scheduler
+        self.constraints_to_solve = self._newFrontier()
         self.num_processed_constraints = 0
+        self.num_pruned_constraints = 0
 
-        self.path = PathToConstraint(lambda c: self.addConstraint(c))
+        locate = scheduler.locate if scheduler is not None else None
+        self.path = PathToConstraint(lambda c: self.addConstraint(c), locate)
+        # optional per-input line/branch coverage (see coverage_collector.py)
+        self.coverage = coverage
         symbolic_type.SymbolicObject.SI = self.path
+        # optional caps on expression growth (see symbolic_types/limits.py)
+        self.limits = limits
+        symbolic_type.SymbolicType.limits = limits
+        # optional Z3 terms built as the program runs (see z3_expr/eager.py)
+        self.eager_terms = None
+        if eager_terms and solver == "z3":
+            from .z3_expr.eager import Z3EagerTerms
+            self.eager_terms = Z3EagerTerms()
+        symbolic_type.SymbolicType.eager = self.eager_terms
+        if solver == "z3":
+            # the integer encoding translates through the terms when built
+            from .z3_expr.integer import Z3Integer
+            Z3Integer.EAGER_TERMS = self.eager_terms is not None
 
+        self.portfolio = solver == "portfolio"
         if solver == "z3":
+            from .z3_wrap import Z3Wrapper
             self.solver = Z3Wrapper()
         elif solver == "cvc":
             from .cvc_wrap import CVCWrapper
             self.solver = CVCWrapper()
+        elif solver == "portfolio":
+            # races the encodings in worker processes (see portfolio.py)
+            from .portfolio import PortfolioWrapper
+            self.solver = PortfolioWrapper(jobs=portfolio_jobs)
         else:
             raise Exception("Unknown solver %s" % solver)
+        # optional SMT-LIB2 files of the Z3 checks (see query_dump.py)
+        if dump_queries is not None and solver != "cvc":
+            from .query_dump import QueryDump
+            self.solver.dump = QueryDump(dump_queries)
 
         self.generated_inputs = []
         self.execution_return_values = []
+        # concrete inputs of every execution, as tuples ordered like
+        # input_names; queued constraints refer to their row by index
+        self.input_names = list(self.symbolic_inputs.keys())
+        self.input_table = []
+        # indices of a subset of generated_inputs with the same coverage
+        self.minimal_inputs = None
+        # optional pool of recent inputs tried before the solver (see model_pool.py)
+        self.model_pool = None
+        if reuse_pool > 0:
+            from .model_pool import ModelPool
+            self.model_pool = ModelPool(reuse_pool)
+        # input vectors run before any query (see seeds.py)
+        self.seeds = seeds or []
+        # optional results of earlier runs (see results_store.py): their
+        # inputs are replayed, and the path conditions without a model are
+        # not queried again
+        self.results = results
+        self.closed = set(results.closed) if results is not None else None
+        self.num_closed_constraints = 0
+        # optional worker process running the executions (see sandbox.py)
+        self.sandbox = sandbox
+        if sandbox is not None:
+            sandbox.attach(funcinv, coverage, locate)
 
     def addConstraint(self, constraint):
-        if constraint not in self.constraints_to_solve:
-            self.constraints_to_solve.append(constraint)
-            constraint.inputs = self._getInputs()
+        if self.path.isInfeasible(constraint):
+            constraint.processed = True
+            self.num_pruned_constraints += 1
+            self._close(constraint)
+            return
+        if self.constraints_to_solve.add(constraint):
+            constraint.inputs = len(self.input_table) - 1
 
     def explore(self, max_iterations=0):
         print(" Starting symbolic exploration...\n")
         self._oneExecution()
+        # the seeds' traces build the tree and the frontier without the solver
+        seeds = self.seeds
+        if self.results is not None:
+            names = set(self.input_names)
+            seeds = seeds + [i for i in self.results.inputs if set(i) == names]
+        ran = 0
+        for seed in seeds:
+            if tuple(seed[n] for n in self.input_names) in self.input_table:
+                continue
+            self._setInputs(seed)
+            self._oneExecution()
+            ran += 1
+        if seeds:
+            log.info("Ran %d seed inputs, %d constraints queued", ran, len(self.constraints_to_solve))
 
         iterations = 1
         if max_iterations != 0 and iterations >= max_iterations:
             return self.execution_return_values
 
+        complete = True
+        if self.results is not None and self.results.isUnchanged() and self.results.complete:
+            # the function was fully explored as it is: the replay is the result
+            log.info("Unchanged since a complete exploration, not solving")
+            self.constraints_to_solve = self._newFrontier()
         while not self._isExplorationComplete():
-            selected = self.constraints_to_solve.popleft()
+            selected = self._selectConstraint()
             if selected.processed:
                 continue
             selected.processed = True
+            if self.path.isInfeasible(selected):
+                self.num_pruned_constraints += 1
+                self._close(selected)
+                continue
+            if self.closed is not None:
+                key = pathKey(selected)
+                if key in self.closed:
+                    self.num_closed_constraints += 1
+                    continue
 
-            self._setInputs(selected.inputs)
+            inputs = self._getInputs(selected.inputs)
             asserts, query = selected.getAssertsAndQuery()
 
-            model = self.solver.findCounterexample(asserts, query)
-            if model is None or all(self._getConcrValue(self.symbolic_inputs[k]) == model[k] for k in model):
+            model = None
+            if self.model_pool is not None:
+                model = self.model_pool.find(asserts, query, inputs)
+            if model is None:
+                model = self.solver.findCounterexample(asserts, query, selected.id)
+            if model is None and self.solver.unsat_core is not None:
+                # the query stands for the selected node's own predicate
+                self.path.addUnsatCore([selected.predicate if p is query else p
+                                        for p in self.solver.unsat_core])
+                # only a proven unsat is persisted
+                self._close(selected)
+            elif model is None:
+                # an unknown answer, a timeout or a rejected model: the path
+                # stays open and a later run has to query it again
+                complete = False
+            if model is None or all(inputs.get(k) == model[k] for k in model):
                 continue
 
-            for name in model.keys():
-                self._updateSymbolicParameter(name, model[name])
-
+            inputs.update(model)
+            self._setInputs(inputs)
             self._oneExecution(selected)
             iterations += 1
             self.num_processed_constraints += 1
 
             if max_iterations != 0 and iterations >= max_iterations:
+                complete = False
                 break
 
+        log.info("Frontier: %d constraints queued, %d duplicate insertions suppressed",
+                 self.constraints_to_solve.added, self.constraints_to_solve.duplicates)
+        log.info("Pruned %d constraints by known unsat cores", self.num_pruned_constraints)
+        if self.limits is not None:
+            log.info("Concretized %d expressions (%s)", self.limits.getConcretizations(), self.limits)
+        if self.model_pool is not None:
+            log.info("Model reuse: %s", self.model_pool)
+        if self.results is not None:
+            log.info("Skipped %d constraints closed by earlier runs", self.num_closed_constraints)
+            inputs = []
+            for row in self.input_table:
+                d = dict(zip(self.input_names, row))
+                if d not in inputs:
+                    inputs.append(d)
+            self.results.save(inputs, self.closed, complete)
+        if self.eager_terms is not None:
+            log.info("Built %d Z3 terms eagerly", self.eager_terms.built)
+        if self.portfolio:
+            log.info("Portfolio wins: %s; %d workers restarted", self.solver, self.solver.restarts)
+            self.solver.close()
+        if self.sandbox is not None:
+            log.info("Sandbox: %s", self.sandbox)
+            self.sandbox.close()
+
+        if self.coverage is not None:
+            self.coverage.close()
+            self.minimal_inputs = self.coverage.minimalSuite()
+
         # Print Summary
         self._printSummary()
         return self.generated_inputs, self.execution_return_values, self.path
 
-    def _updateSymbolicParameter(self, name, val):
-        self.symbolic_inputs[name] = self.invocation.createArgumentValue(name, val)
+    def _close(self, constraint):
+        """Records that the path condition of constraint is proven unsat."""
+        if self.closed is not None:
+            self.closed.add(pathKey(constraint))
 
-    def _getInputs(self):
-        return self.symbolic_inputs.copy()
+    def _getInputs(self, index):
+        """Concrete inputs of the index-th execution, by argument name."""
+        return dict(zip(self.input_names, self.input_table[index]))
 
     def _setInputs(self, d):
-        self.symbolic_inputs = d
+        """Rebuilds the symbolic arguments from concrete values."""
+        self.symbolic_inputs = {n: self.invocation.createArgumentValue(n, v) for n, v in d.items()}
+
+    def _newFrontier(self):
+        return self.scheduler.newFrontier() if self.scheduler is not None else Frontier()
+
+    def _selectConstraint(self):
+        return self.constraints_to_solve.popleft()
 
     def _isExplorationComplete(self):
+        if self.scheduler is not None and self.scheduler.isComplete():
+            log.info("All reachable branches covered, stopping exploration")
+            return True
         return len(self.constraints_to_solve) == 0
 
     def _getConcrValue(self, v):
@@ -101,12 +237,33 @@ class ExplorationEngine:
     def _recordInputs(self):
         inputs = [(k, self._getConcrValue(v)) for k, v in self.symbolic_inputs.items()]
         self.generated_inputs.append(inputs)
+        self.input_table.append(tuple(v for _, v in inputs))
+        if self.model_pool is not None:
+            self.model_pool.add(dict(inputs))
 
     def _oneExecution(self, expected_path=None):
         self._recordInputs()
         self.path.reset(expected_path)
-        ret = self.invocation.callFunction(self.symbolic_inputs)
+        if self.sandbox is None:
+            ret = self._callFunction()
+        else:
+            ret = self.sandbox.run(self.path, dict(self.generated_inputs[-1]))
         self.execution_return_values.append(ret)
+        if self.scheduler is not None:
+            lines = None
+            if self.coverage is not None:
+                filename = self.scheduler.inventory.filename
+                lines = {l for f, l in self.coverage.lastExecution()[0] if f == filename}
+            self.scheduler.recordPath(self.path.current_constraint, lines)
+
+    def _callFunction(self):
+        if self.coverage is None:
+            return self.invocation.callFunction(self.symbolic_inputs)
+        self.coverage.start()
+        try:
+            return self.invocation.callFunction(self.symbolic_inputs)
+        finally:
+            self.coverage.stop()
 
     def _printSummary(self):
         print("\n" + "="*70)
@@ -124,3 +281,20 @@ class ExplorationEngine:
         print("\n╭─  Condition Coverage using DSE ─╮")
         print(f"│ {covered} / {total} => {coverage:.2f}% coverage         │")
         print("╰───────────────────────────────────╯")
+        if self.coverage is not None:
+            print(f"Executed lines: {len(self.coverage.getLines())}, branch arcs: {len(self.coverage.getArcs())}")
+            print(f"Minimal suite with the same coverage: {len(self.minimal_inputs)} of {len(self.generated_inputs)} "
+                  f"inputs: {', '.join('#%d' % (i + 1) for i in self.minimal_inputs)}")
+        if self.limits is not None and self.limits.getConcretizations() > 0:
+            print(f"Concretized expressions ({self.limits.policy}): {self.limits}")
+        if self.portfolio:
+            print(f"Solver portfolio wins: {self.solver}")
+        if self.model_pool is not None:
+            print(f"Queries answered from recent inputs: {self.model_pool}")
+        if self.sandbox is not None:
+            print(f"Sandbox: {self.sandbox}")
+        if self.results is not None:
+            print(f"Earlier results {self.results}; {self.num_closed_constraints} constraints not queried again")
+        if self.scheduler is not None:
+            covered, total = self.scheduler.getCoverage()
+            print(f"Reachable branch outcomes covered (static inventory): {covered} / {total}")
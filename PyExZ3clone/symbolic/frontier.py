@@ -0,0 +1,93 @@
+# Copyright: see copyright.txt
+
+import heapq
+from collections import deque
+
+
+class Frontier:
+    """FIFO of the constraints waiting to be solved, with O(1) membership.
+    A node of the constraint tree is unique for its parent and (interned)
+    predicate, so Constraint equality reduces to identity and members are
+    tracked by id() while they sit in the queue."""
+
+    def __init__(self):
+        self.queue = deque()
+        self.members = set()
+        self.added = 0
+        self.duplicates = 0
+
+    def add(self, constraint):
+        """Appends constraint unless it is already queued; returns whether it was added."""
+        if id(constraint) in self.members:
+            self.duplicates += 1
+            return False
+        self.members.add(id(constraint))
+        self.queue.append(constraint)
+        self.added += 1
+        return True
+
+    def popleft(self):
+        c = self.queue.popleft()
+        self.members.discard(id(c))
+        return c
+
+    def __contains__(self, constraint):
+        return id(constraint) in self.members
+
+    def __len__(self):
+        return len(self.queue)
+
+    def __iter__(self):
+        return iter(self.queue)
+
+    def __getitem__(self, i):
+        return self.queue[i]
+
+    def __delitem__(self, i):
+        self.members.discard(id(self.queue[i]))
+        del self.queue[i]
+
+
+class PriorityFrontier(Frontier):
+    """Frontier handing out the constraint of lowest priority(constraint)
+    first, FIFO among equals. Priorities may only grow as the search goes
+    on, and only when version() changes: a heap entry keeps the priority
+    computed at the version it was pushed with, a lower bound that is
+    recomputed when the entry reaches the top."""
+
+    def __init__(self, priority, version):
+        Frontier.__init__(self)
+        self.priority = priority
+        self.version = version
+        self.queue = []
+        self.seq = 0
+
+    def add(self, constraint):
+        if id(constraint) in self.members:
+            self.duplicates += 1
+            return False
+        self.members.add(id(constraint))
+        heapq.heappush(self.queue, (self.priority(constraint), self.seq, self.version(), constraint))
+        self.seq += 1
+        self.added += 1
+        return True
+
+    def popleft(self):
+        while True:
+            prio, seq, version, c = heapq.heappop(self.queue)
+            if version != self.version():
+                prio = self.priority(c)
+                if self.queue and (prio, seq) > self.queue[0][:2]:
+                    heapq.heappush(self.queue, (prio, seq, self.version(), c))
+                    continue
+            self.members.discard(id(c))
+            return c
+
+    def __iter__(self):
+        return (c for _, _, _, c in self.queue)
+
+    def __getitem__(self, i):
+        raise TypeError("PriorityFrontier is not indexable")
+
+    def __delitem__(self, i):
+        raise TypeError("PriorityFrontier is not indexable")
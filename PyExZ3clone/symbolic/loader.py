@@ -133,6 +133,7 @@ def loaderFactory(filename,entry):
 		
 
 ###########################################################
+import importlib.machinery
 import inspect
 import re
 import os
@@ -140,9 +141,41 @@ import sys
 from .invocation import FunctionInvocation
 from .symbolic_types import SymbolicInteger, getSymbolic
 
-# Preserve symbolic types for len()
-import builtins
-builtins.len = (lambda x: x.__len__())
+
+# containers whose length is always concrete, left to the builtin
+_CONCRETE_SIZED = frozenset([str, bytes, bytearray, list, tuple, dict, set, frozenset, range])
+
+
+def symbolicLen(x):
+    """len() as seen by the target: the builtin converts what __len__
+    returns to an int, which would drop a symbolic length."""
+    return len(x) if type(x) in _CONCRETE_SIZED else x.__len__()
+
+
+class _TargetLoader(importlib.machinery.SourceFileLoader):
+    def exec_module(self, module):
+        # a module-level len shadows the builtin for the module's code only
+        module.len = symbolicLen
+        super().exec_module(module)
+
+
+class TargetFinder:
+    """Import hook giving symbolicLen to the modules found under the
+    target's directory (the target and its helpers), before their code
+    runs. Everything else keeps the builtin len."""
+
+    def __init__(self, directory):
+        self.directory = os.path.abspath(directory) + os.sep
+        self.engine = os.path.dirname(os.path.abspath(__file__)) + os.sep
+
+    def find_spec(self, name, path, target=None):
+        spec = importlib.machinery.PathFinder.find_spec(name, path)
+        if spec is None or not isinstance(spec.loader, importlib.machinery.SourceFileLoader):
+            return None
+        if not spec.origin.startswith(self.directory) or spec.origin.startswith(self.engine):
+            return None
+        spec.loader = _TargetLoader(name, spec.origin)
+        return spec
 
 
 class Loader:
@@ -158,6 +191,9 @@ class Loader:
     def getEntry(self):
         return self._entryPoint
 
+    def getEntryFunction(self):
+        return self.app.__dict__[self._entryPoint] if self._entryPoint else None
+
     def createInvocation(self):
         inv = FunctionInvocation(self._execute, self._resetCallback)
         if self._entryPoint:
@@ -255,6 +291,8 @@ def loaderFactory(filename, entry=None):
     try:
         dir_path = os.path.dirname(filename)
         sys.path.insert(0, dir_path)  # Add script directory to sys.path
+        if not any(isinstance(f, TargetFinder) for f in sys.meta_path):
+            sys.meta_path.insert(0, TargetFinder(dir_path))
         loader = Loader(filename, entry)
 
         # If entry function is missing, execute the entire script
@@ -0,0 +1,123 @@
+# Copyright: see copyright.txt
+
+import operator
+from collections import deque
+
+from z3 import Solver
+
+from .components import queryComponent
+from .symbolic_types import SymbolicInteger, SymbolicStr, SymbolicType
+from .z3_expr.integer import Z3Integer
+
+# operators whose concrete semantics are Python's own
+_PYTHON_OPS = {
+    "+": operator.add, "-": operator.sub, "*": operator.mul,
+    "//": operator.floordiv, "%": operator.mod,
+    "<<": operator.lshift, ">>": operator.rshift,
+    "^": operator.xor, "|": operator.or_, "&": operator.and_,
+    "==": operator.eq, "!=": operator.ne,
+    "<": operator.lt, ">": operator.gt, "<=": operator.le, ">=": operator.ge,
+    "and": lambda l, r: l and r, "or": lambda l, r: l or r,
+    "not": operator.not_,
+}
+
+# string operations, evaluated by the Z3 translation on concrete operands
+_STR_OPS = {"str.len", "in", "str.startswith", "str.find", "str.replace",
+            "str.replace_all", "str.count", "str.strip", "getitem", "slice"}
+
+
+class ModelPool:
+    """Bounded pool of the most recent concrete input vectors. Before a
+    query goes to the solver, the predicates of its component (see
+    components.py) are evaluated under every vector of the pool, and the
+    values of the first vector that satisfies them (with the query
+    negated) are used instead of a model. Like a model, they only cover
+    the component's variables and are merged into the current inputs,
+    which already satisfy the other components. Whole vectors never
+    answer a query: one that follows the path up to the query takes one
+    of its branches when it runs.
+
+    Expressions are compiled once into closures over an input vector
+    (predicates are interned, so a compiled closure serves every query on
+    the same branch). Integer and Boolean operators are evaluated with
+    Python's semantics; the other operations use the concrete evaluation
+    of the Z3 translation, as when a model is checked (see
+    Z3Wrapper._mismatch)."""
+
+    def __init__(self, size):
+        self.vectors = deque(maxlen=size)
+        self.compiled = {}
+        self.z3_expr = Z3Integer()
+        self.solver = Solver()
+        self.hits = 0
+        self.misses = 0
+        self.evaluations = 0
+
+    def add(self, inputs):
+        if inputs not in self.vectors:
+            self.vectors.append(inputs)
+
+    def find(self, asserts, query, inputs):
+        """Values of the variables of query's component in a vector of the
+        pool satisfying the component and the negation of query, or None.
+        Vectors with the same values as inputs are skipped."""
+        component = queryComponent(asserts, query)
+        names = set(query.getVars())
+        for p in component:
+            names.update(p.getVars())
+        preds = [(self._compiled(p.symtype), p.result) for p in component]
+        preds.append((self._compiled(query.symtype), not query.result))
+        for v in reversed(self.vectors):
+            values = {n: v[n] for n in names if n in v}
+            if len(values) < len(names) or all(inputs.get(n) == values[n] for n in names):
+                continue
+            self.evaluations += 1
+            if self._satisfies(preds, v):
+                self.hits += 1
+                return values
+        self.misses += 1
+        return None
+
+    def __str__(self):
+        return "%d hits, %d misses, %d vectors evaluated" % (self.hits, self.misses, self.evaluations)
+
+    # private
+
+    def _satisfies(self, preds, env):
+        try:
+            return all(bool(f(env)) == result for f, result in preds)
+        except Exception:
+            # e.g. a division by zero: this vector does not follow the path
+            return False
+
+    def _compiled(self, symtype):
+        # keyed by identity, the symtype is kept alive with its closure
+        entry = self.compiled.get(id(symtype))
+        if entry is None:
+            entry = self.compiled[id(symtype)] = (symtype, self._compile(symtype))
+        return entry[1]
+
+    def _compile(self, expr):
+        if isinstance(expr, (SymbolicInteger, SymbolicStr)):
+            if expr.isVariable():
+                name = expr.name
+                return lambda env: env[name]
+            return self._compile(expr.expr)
+        if isinstance(expr, list):
+            op = expr[0]
+            if op in _PYTHON_OPS:
+                fun = _PYTHON_OPS[op]
+                args = [self._compile(a) for a in expr[1:]]
+                if len(args) == 1:
+                    a = args[0]
+                    return lambda env: fun(a(env))
+                l, r = args
+                return lambda env: fun(l(env), r(env))
+            if op in _STR_OPS:
+                args = [self._compile(a) for a in expr[1:]]
+                return lambda env: self.z3_expr._astToZ3Expr([op] + [a(env) for a in args], self.solver, env)
+            # lists and dictionaries: evaluated on their input values
+            return lambda env: self.z3_expr._astToZ3Expr(expr, self.solver, env)
+        if isinstance(expr, SymbolicType):
+            return lambda env: self.z3_expr._astToZ3Expr(expr, self.solver, env)
+        return lambda env: expr
@@ -2,16 +2,21 @@
 
 import logging
 
-from .predicate import Predicate
+from .predicate import PredicateTable
 from .constraint import Constraint
 
 log = logging.getLogger("se.pathconstraint")
 
 
 class PathToConstraint:
-    def __init__(self, add):
-        self.constraints = {}
+    def __init__(self, add, locate=None):
+        self.predicates = PredicateTable()
+        # unsat cores learned from the solver, as sets of predicate ids,
+        # indexed by each of their (interned) predicates
+        self.unsat_cores = {}
         self.add = add
+        # optional callback returning the source location of the current branch
+        self.locate = locate
         self.root_constraint = Constraint(None, None)
         self.current_constraint = self.root_constraint
         self.expected_path = None
@@ -28,8 +33,8 @@ class PathToConstraint:
                 tmp = tmp.parent
 
     def whichBranch(self, branch, symobj):
-        p_true = Predicate(symobj, True)
-        p_false = Predicate(symobj, False)
+        p_true = self.predicates.intern(symobj, True)
+        p_false = self.predicates.intern(symobj, False)
         taken_pred = p_true if branch else p_false
         taken_node = self.current_constraint.findChild(taken_pred)
         if taken_node is None:
@@ -41,6 +46,9 @@ class PathToConstraint:
         opp_node = self.current_constraint.findChild(opp_pred)
         if opp_node is None:
             opp_node = self.current_constraint.addChild(opp_pred)
+        if self.locate is not None:
+            taken_node.site = opp_node.site = self.locate()
+
         # Enqueue the opposite side for later, if not already done
         if not opp_node.processed:
             log.debug("Queuing opposite branch for later: %s", opp_node)
@@ -52,6 +60,38 @@ class PathToConstraint:
         # Advance down the taken path
         self.current_constraint = taken_node
 
+    def assume(self, symobj):
+        """Extends the current path with a predicate that holds by construction,
+        such as the concrete value chosen for a concretized expression. Unlike
+        whichBranch, no opposite branch is created or queued."""
+        pred = self.predicates.intern(symobj, True)
+        node = self.current_constraint.findChild(pred)
+        if node is None:
+            node = self.current_constraint.addChild(pred)
+        log.debug("Assuming: %s", node)
+        node.processed = True
+        self.current_constraint = node
+
+    def addUnsatCore(self, core):
+        """Records a set of interned predicates that cannot hold together."""
+        ids = frozenset(id(p) for p in core)
+        for i in ids:
+            self.unsat_cores.setdefault(i, []).append(ids)
+
+    def isInfeasible(self, constraint):
+        """True if the path to constraint contains a known unsat core. The
+        prefix of a queued node was executed, so a core that applies to it
+        must contain the node's own predicate."""
+        cores = self.unsat_cores.get(id(constraint.predicate))
+        if not cores:
+            return False
+        path = set()
+        tmp = constraint
+        while tmp.predicate is not None:
+            path.add(id(tmp.predicate))
+            tmp = tmp.parent
+        return any(core <= path for core in cores)
+
     def toDot(self):
         # print the thing into DOT format
         header = "digraph {\n"
@@ -0,0 +1,255 @@
+# Copyright: see copyright.txt
+
+import importlib.util
+import logging
+import multiprocessing
+import os
+import pickle
+import signal
+import time
+from multiprocessing.connection import wait
+
+from z3 import unknown
+
+from symbolic.z3_wrap import Z3Wrapper
+from symbolic.z3_expr.integer import Z3Integer
+from symbolic.query_dump import QueryDump
+
+log = logging.getLogger("se.portfolio")
+
+def available(encoding):
+	return encoding != "cvc" or importlib.util.find_spec("CVC4") is not None
+
+def _newSolver(encoding):
+	if encoding == "cvc":
+		from symbolic.cvc_wrap import CVCWrapper
+		return CVCWrapper()
+	# a worker receives fresh copies of the predicates: ids do not identify them
+	solver = Z3Wrapper(cache=False)
+	solver.use_lia = encoding == "z3-lia"
+	solver.use_bv = encoding == "z3-bv"
+	return solver
+
+def _serve(encoding, conn, dump_dir, cancel):
+	"""Loop of a worker process: solves the queries it receives in its
+	   encoding and answers (query id, model, unsat core, seconds). The
+	   core lists positions in the asserts, -1 standing for the query.
+	   A Z3 query is cancelled by setting cancel to its id and sending
+	   SIGINT, which makes Z3 give up the running check (see
+	   PortfolioWrapper._cancel); the checks left are skipped."""
+	solver = _newSolver(encoding)
+	if dump_dir is not None and isinstance(solver, Z3Wrapper):
+		solver.dump = QueryDump(dump_dir, "%s-%d" % (encoding, os.getpid()))
+	# Z3 handles SIGINT during a check; elsewhere it must not interrupt
+	signal.signal(signal.SIGINT, lambda signum, frame: None)
+	current = [None]
+	if isinstance(solver, Z3Wrapper):
+		check = solver._check
+		def _check(*args):
+			if cancel.value == current[0]:
+				return unknown
+			return check(*args)
+		solver._check = _check
+	while True:
+		try:
+			msg = conn.recv_bytes()
+		except EOFError:
+			return
+		qid, asserts, query, constraint_id, path_length = pickle.loads(msg)
+		current[0] = qid
+		start = time.perf_counter()
+		core = None
+		try:
+			model = solver.findCounterexample(asserts, query, constraint_id, path_length)
+			if solver.unsat_core is not None:
+				pos = { id(a): i for i, a in enumerate(asserts) }
+				core = [ -1 if p is query else pos[id(p)] for p in solver.unsat_core ]
+		except Exception as e:
+			log.debug("%s failed: %s" % (encoding, e))
+			model = None
+		conn.send((qid, model, core, time.perf_counter() - start))
+
+class _Worker(object):
+	def __init__(self, encoding, context, dump_dir):
+		self.conn, child = context.Pipe()
+		# id of the query the worker should give up
+		self.cancel = context.RawValue("q", 0)
+		self.process = context.Process(target=_serve, args=(encoding, child, dump_dir, self.cancel), daemon=True)
+		self.process.start()
+		child.close()
+		# id of the query being solved, and since when it lost its race
+		self.qid = None
+		self.stale_since = None
+
+	def stop(self):
+		self.conn.close()
+		self.process.terminate()
+		self.process.join()
+
+class PortfolioWrapper(Z3Wrapper):
+	"""Races every query in several encodings, each solved by its own
+	   worker process: Z3 over unbounded integers (its unsat answers are
+	   final, with a core), Z3 over bit-vectors of increasing width and CVC
+	   (if installed). The first model validated against the concrete
+	   semantics (by the Z3 workers themselves, here for CVC) or final
+	   unsat wins. The losers are stopped at once: the Z3 workers cancel
+	   their check and answer, CVC workers are restarted. A worker that
+	   has still not answered CANCEL_AFTER seconds later is restarted.
+	   With fewer jobs than encodings, the encodings that won most often
+	   race first."""
+
+	ENCODINGS = ("z3-lia", "z3-bv", "cvc")
+	CANCEL_AFTER = 1.0
+
+	def __init__(self, encodings=ENCODINGS, jobs=0):
+		Z3Wrapper.__init__(self)
+		self.encodings = [ e for e in encodings if available(e) ]
+		self.jobs = jobs if jobs > 0 else len(self.encodings)
+		self.context = multiprocessing.get_context("fork")
+		self.workers = {}
+		self.qid = 0
+		# wins and winning seconds per encoding
+		self.wins = { e: 0 for e in self.encodings }
+		self.win_time = { e: 0.0 for e in self.encodings }
+		self.restarts = 0
+
+	def ranking(self):
+		"""Encodings by decreasing wins, then by mean winning time."""
+		return sorted(self.encodings, key=lambda e:
+			(-self.wins[e], self.win_time[e] / self.wins[e] if self.wins[e] else 0.0))
+
+	def close(self):
+		for w in self.workers.values():
+			w.stop()
+		self.workers = {}
+
+	def __str__(self):
+		return ", ".join("%s %d (%.1f ms)" % (e, self.wins[e],
+			1000 * self.win_time[e] / self.wins[e] if self.wins[e] else 0.0)
+			for e in self.ranking())
+
+	# private
+
+	def _findModel(self):
+		self.qid += 1
+		try:
+			payload = pickle.dumps((self.qid, self.asserts, self.query, self.constraint_id, self.path_length))
+		except RecursionError:
+			# too deep to be sent: solve it here
+			return Z3Wrapper._findModel(self)
+		ranking = self.ranking()
+		for i in range(0, len(ranking), self.jobs):
+			decided, model = self._race(ranking[i:i + self.jobs], payload)
+			if decided:
+				return model
+		return None
+
+	def _race(self, encodings, payload):
+		"""(decided, model) of racing the query in encodings. A worker still
+		   busy with a lost race joins once it has answered it, or once it
+		   has been restarted for being overdue."""
+		racing = {}
+		stale = {}
+		for e in encodings:
+			w = self._worker(e)
+			if w.qid is None:
+				racing[self._send(w, payload)] = e
+			else:
+				stale[w.conn] = e
+		while racing or stale:
+			timeout = None
+			if stale:
+				overdue = min(self.workers[e].stale_since for e in stale.values()) + PortfolioWrapper.CANCEL_AFTER
+				timeout = max(0.0, overdue - time.perf_counter())
+			ready = wait(list(racing) + list(stale), timeout)
+			if not ready:
+				for conn, e in list(stale.items()):
+					if self._overdue(self.workers[e]):
+						del stale[conn]
+						racing[self._send(self._restart(e), payload)] = e
+				continue
+			for conn in ready:
+				if conn in stale:
+					e = stale.pop(conn)
+					w = self.workers[e]
+					try:
+						conn.recv()
+						w.qid = None
+					except EOFError:
+						w = self._restart(e)
+					racing[self._send(w, payload)] = e
+					continue
+				e = racing.pop(conn)
+				try:
+					qid, model, core, seconds = conn.recv()
+				except EOFError:
+					self._restart(e)
+					continue
+				self.workers[e].qid = None
+				if model is not None and not e.startswith("z3") and not self._valid(model):
+					log.debug("%s model rejected: %s" % (e, model))
+					model = None
+				if model is not None or e == "z3-lia" and core is not None:
+					self._win(e, seconds, racing)
+					if core is not None:
+						self.unsat_core = [ self.query if j < 0 else self.asserts[j] for j in core ]
+					return (True, model)
+		return (False, None)
+
+	def _send(self, w, payload):
+		w.conn.send_bytes(payload)
+		w.qid, w.stale_since = self.qid, None
+		return w.conn
+
+	def _win(self, encoding, seconds, losers):
+		log.debug("%s won in %.3fs" % (encoding, seconds))
+		self.wins[encoding] += 1
+		self.win_time[encoding] += seconds
+		now = time.perf_counter()
+		for e in losers.values():
+			w = self.workers[e]
+			if e.startswith("z3"):
+				self._cancel(w)
+				w.stale_since = now
+			else:
+				self._restart(e)
+
+	def _cancel(self, w):
+		w.cancel.value = w.qid
+		try:
+			os.kill(w.process.pid, signal.SIGINT)
+		except ProcessLookupError:
+			pass
+
+	def _valid(self, model):
+		"""Does the model satisfy the asserts and the query concretely?"""
+		self.z3_expr = Z3Integer()
+		return not self._mismatch(model)
+
+	def _overdue(self, w):
+		return time.perf_counter() - w.stale_since >= PortfolioWrapper.CANCEL_AFTER
+
+	def _worker(self, encoding):
+		"""The worker of encoding, restarted if it died or is overdue."""
+		w = self.workers.get(encoding)
+		if w is None or not w.process.is_alive():
+			return self._restart(encoding)
+		# drain the answer to a lost race, if it arrived meanwhile
+		if w.qid is not None and w.conn.poll():
+			try:
+				w.conn.recv()
+				w.qid = None
+			except EOFError:
+				return self._restart(encoding)
+		if w.qid is not None and self._overdue(w):
+			return self._restart(encoding)
+		return w
+
+	def _restart(self, encoding):
+		w = self.workers.pop(encoding, None)
+		if w is not None:
+			self.restarts += 1
+			w.stop()
+		dump_dir = self.dump.directory if self.dump is not None else None
+		w = self.workers[encoding] = _Worker(encoding, self.context, dump_dir)
+		return w
@@ -1,8 +1,12 @@
 # Copyright - see copyright.txt
 
+from .symbolic_types.symbolic_type import SymbolicType
+
 class Predicate:
 	"""Predicate is one specific ``if'' encountered during the program execution.
 	   """
+	__slots__ = ("symtype", "result")
+
 	def __init__(self, st, result):
 		self.symtype = st
 		self.result = result
@@ -11,6 +15,8 @@ class Predicate:
 		return self.symtype.getVars()
 
 	def __eq__(self, other):
+		if self is other:
+			return True
 		if isinstance(other, Predicate):
 			res = self.result == other.result and self.symtype.symbolicEq(other.symtype)
 			return res
@@ -26,8 +32,39 @@ class Predicate:
 	def __repr__(self):
 		return self.__str__()
 
-	def negate(self):
-		"""Negates the current predicate"""
-		assert(self.result is not None)
-		self.result = not self.result
 
+class PredicateTable:
+	"""Interns predicates: structurally equal branch conditions met along
+	   different paths (or again in later executions) share one Predicate,
+	   and with it one symbolic expression. Expressions are hash-consed
+	   into small integer ids to form the keys."""
+	def __init__(self):
+		self.predicates = {}
+		self.exprs = {}
+
+	def intern(self, st, result):
+		key = (self._exprId(st), result)
+		p = self.predicates.get(key)
+		if p is None:
+			p = self.predicates[key] = Predicate(st, result)
+		return p
+
+	def __len__(self):
+		return len(self.predicates)
+
+	def _exprId(self, e):
+		if isinstance(e, SymbolicType):
+			key = ("$", e.name) if e.isVariable() else self._exprId(e.expr)
+		elif isinstance(e, list):
+			key = (e[0],) + tuple(self._exprId(a) for a in e[1:])
+		else:
+			key = (type(e), e)
+			try:
+				hash(key)
+			except TypeError:
+				# unhashable constant (e.g. a dict): equal values print alike
+				key = (type(e), "repr", repr(e))
+		eid = self.exprs.get(key)
+		if eid is None:
+			eid = self.exprs[key] = len(self.exprs)
+		return eid
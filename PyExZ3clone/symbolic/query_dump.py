@@ -0,0 +1,40 @@
+# Copyright: see copyright.txt
+
+import os
+
+class QueryDump(object):
+	"""Writes every solver check as an SMT-LIB2 benchmark, one file per
+	   check, headed by "; key: value" metadata lines (see readQuery). The
+	   tracking literals of a tracked check are asserted, so that a file
+	   replays the check as it was made."""
+
+	def __init__(self, directory, prefix="query"):
+		os.makedirs(directory, exist_ok=True)
+		self.directory = directory
+		self.prefix = prefix
+		self.count = 0
+
+	def write(self, solver, trackers, meta):
+		self.count += 1
+		path = os.path.join(self.directory, "%s_%05d.smt2" % (self.prefix, self.count))
+		with open(path, "w") as f:
+			for key, value in meta.items():
+				f.write("; %s: %s\n" % (key, value))
+			f.write("(set-info :status %s)\n" % meta.get("result", "unknown"))
+			f.write(solver.sexpr())
+			for t in trackers:
+				f.write("(assert %s)\n" % t)
+			f.write("(check-sat)\n")
+		return path
+
+def readQuery(path):
+	"""(metadata, SMT-LIB2 text) of a file written by QueryDump."""
+	meta = {}
+	with open(path) as f:
+		text = f.read()
+	for line in text.splitlines():
+		if not line.startswith("; "):
+			break
+		key, _, value = line[2:].partition(": ")
+		meta[key] = value
+	return meta, text
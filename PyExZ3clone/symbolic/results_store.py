@@ -0,0 +1,121 @@
+# Copyright: see copyright.txt
+
+import hashlib
+import logging
+import os
+import pickle
+import types
+
+from .symbolic_types import SymbolicType
+
+log = logging.getLogger("se.results")
+
+
+def functionHash(func):
+    """Hex digest of the bytecode of func and of the functions and classes
+    of its module that it reaches by name, transitively. Comments, blank
+    lines and edits to unrelated functions leave it unchanged."""
+    h = hashlib.sha256()
+    seen = set()
+    todo = [func]
+    while todo:
+        f = todo.pop()
+        if id(f) in seen:
+            continue
+        seen.add(id(f))
+        if isinstance(f, type):
+            h.update(f.__qualname__.encode())
+            todo.extend(v for v in vars(f).values() if isinstance(v, types.FunctionType))
+            continue
+        code = f.__code__
+        _hashCode(h, code)
+        module = f.__globals__
+        for name in _names(code):
+            v = module.get(name)
+            if isinstance(v, (types.FunctionType, type)) and getattr(v, "__module__", None) == f.__module__:
+                todo.append(v)
+    return h.hexdigest()
+
+
+def _hashCode(h, code):
+    h.update(code.co_code)
+    h.update(repr(code.co_names).encode())
+    h.update(repr(code.co_varnames).encode())
+    for c in code.co_consts:
+        if isinstance(c, types.CodeType):
+            _hashCode(h, c)
+        else:
+            h.update(repr(c).encode())
+
+
+def _names(code):
+    names = set(code.co_names)
+    for c in code.co_consts:
+        if isinstance(c, types.CodeType):
+            names |= _names(c)
+    return names
+
+
+def pathKey(constraint):
+    """The path condition of a node of the constraint tree, as a tuple of
+    (expression, outcome) pairs from the root that does not depend on the
+    concrete values of the execution that built it."""
+    key = []
+    while constraint.predicate is not None:
+        key.append((_canonical(constraint.predicate.symtype), constraint.predicate.result))
+        constraint = constraint.parent
+    return tuple(reversed(key))
+
+
+def _canonical(expr):
+    if isinstance(expr, list):
+        return "(" + expr[0] + " " + ", ".join(_canonical(a) for a in expr[1:]) + ")"
+    if isinstance(expr, SymbolicType):
+        return expr.name if expr.isVariable() else _canonical(expr.expr)
+    return repr(expr)
+
+
+class ResultsStore:
+    """Results of the explorations of an entry point, saved in a folder
+    across runs: the digest of the function (see functionHash), its input
+    vectors and the path conditions the solver proved unsat. The inputs
+    are replayed concretely on the next run and the path conditions are
+    not queried again; an unsat condition stays unsat whatever the code
+    that produced it. Unknown answers and timeouts are not kept. If the
+    function is unchanged since a complete exploration, the replay alone
+    is its result."""
+
+    def __init__(self, directory, module, entry, digest):
+        self.path = os.path.join(directory, "%s.%s.pickle" % (module, entry))
+        self.digest = digest
+        self.previous_digest = None
+        self.inputs = []
+        self.closed = set()
+        # whether the saved exploration ran out of branches to solve
+        self.complete = False
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "rb") as f:
+                    saved = pickle.load(f)
+                self.previous_digest = saved["digest"]
+                self.inputs = saved["inputs"]
+                self.closed = saved["closed"]
+                self.complete = saved["complete"]
+            except (OSError, pickle.UnpicklingError, EOFError, KeyError) as e:
+                log.warning("Ignoring unreadable results %s: %s", self.path, e)
+
+    def isUnchanged(self):
+        return self.digest == self.previous_digest
+
+    def save(self, inputs, closed, complete):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump({"digest": self.digest, "inputs": inputs, "closed": closed,
+                         "complete": complete}, f)
+        os.replace(tmp, self.path)
+
+    def __str__(self):
+        state = "unchanged" if self.isUnchanged() else "new" if self.previous_digest is None else "changed"
+        return "%s (%s): %d saved inputs, %d closed path conditions" % (
+            os.path.basename(self.path), state, len(self.inputs), len(self.closed))
@@ -0,0 +1,256 @@
+# Copyright: see copyright.txt
+
+import logging
+import math
+import multiprocessing
+import pickle
+import resource
+import signal
+
+from .symbolic_types import symbolic_type
+
+log = logging.getLogger("se.sandbox")
+
+
+class LimitExceeded(object):
+    """Outcome of an execution the sandbox stopped: "timeout" (wall clock),
+    "cpu", "memory" or "crash" (the worker died)."""
+
+    def __init__(self, kind):
+        self.kind = kind
+
+    def __eq__(self, other):
+        return isinstance(other, LimitExceeded) and self.kind == other.kind
+
+    def __hash__(self):
+        return hash(("LimitExceeded", self.kind))
+
+    def __repr__(self):
+        return "<%s>" % self.kind
+
+
+class _Stop(BaseException):
+    """Raised in the worker when a limit is hit; not an Exception, so that
+    the target's handlers do not swallow it."""
+
+    def __init__(self, kind):
+        BaseException.__init__(self, kind)
+        self.kind = kind
+
+
+class _BranchRecorder:
+    """Stands for the PathToConstraint of the engine in the worker: the
+    branches are sent back and replayed there (see Sandbox._replay)."""
+
+    def __init__(self, locate):
+        self.locate = locate
+        self.events = []
+
+    def whichBranch(self, branch, symobj):
+        site = self.locate() if self.locate is not None else None
+        self.events.append((branch, symobj, site))
+
+    def assume(self, symobj):
+        self.events.append((None, symobj, None))
+
+
+def _raise(kind):
+    def handler(signum, frame):
+        raise _Stop(kind)
+    return handler
+
+
+def _serve(conn, invocation, coverage, locate, timeout, cpu, memory):
+    """Loop of the worker process: runs the target on the concrete inputs
+    it receives and answers (outcome, branches, lines, arcs)."""
+    if memory:
+        resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    signal.signal(signal.SIGALRM, _raise("timeout"))
+    signal.signal(signal.SIGXCPU, _raise("cpu"))
+    hard_cpu = resource.getrlimit(resource.RLIMIT_CPU)[1]
+    while True:
+        try:
+            inputs = conn.recv()
+        except EOFError:
+            return
+        recorder = _BranchRecorder(locate)
+        symbolic_type.SymbolicObject.SI = recorder
+        args = {n: invocation.createArgumentValue(n, v) for n, v in inputs.items()}
+        if cpu:
+            # RLIMIT_CPU counts the whole life of the worker
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            soft = math.ceil(usage.ru_utime + usage.ru_stime) + cpu
+            if hard_cpu != resource.RLIM_INFINITY:
+                soft = min(soft, hard_cpu)
+            resource.setrlimit(resource.RLIMIT_CPU, (soft, hard_cpu))
+        if coverage is not None:
+            coverage.start()
+        try:
+            if timeout:
+                signal.setitimer(signal.ITIMER_REAL, timeout)
+            outcome = ("return", invocation.callFunction(args))
+        except _Stop as e:
+            outcome = ("limit", e.kind)
+        except MemoryError:
+            outcome = ("limit", "memory")
+        except BaseException as e:
+            outcome = ("raise", e)
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            if cpu:
+                # past the soft limit, SIGXCPU would keep coming every second
+                resource.setrlimit(resource.RLIMIT_CPU, (hard_cpu, hard_cpu))
+            if coverage is not None:
+                coverage.stop()
+        lines, arcs = coverage.lastExecution() if coverage is not None else (None, None)
+        msg = _message(outcome, recorder.events, lines, arcs)
+        conn.send_bytes(msg)
+
+
+def _message(outcome, events, lines, arcs):
+    """Pickled answer of the worker, with the number of branches left out:
+    a return value or exception that does not pickle is sent as its text,
+    and the branches are cut before the first one that does not pickle
+    (or is too deep for pickle)."""
+    try:
+        return pickle.dumps((outcome, events, lines, arcs, 0))
+    except Exception:
+        pass
+    try:
+        pickle.dumps(outcome)
+    except Exception:
+        outcome = (outcome[0], _text(outcome[1]))
+        if outcome[0] == "raise":
+            outcome = ("raise", RuntimeError(outcome[1]))
+    sent = []
+    for event in events:
+        try:
+            pickle.dumps(event)
+        except Exception:
+            break
+        sent.append(event)
+    try:
+        return pickle.dumps((outcome, sent, lines, arcs, len(events) - len(sent)))
+    except Exception:
+        return pickle.dumps((outcome, [], lines, arcs, len(events)))
+
+
+def _text(value):
+    try:
+        return repr(value)
+    except Exception:
+        return "<%s>" % type(value).__name__
+
+
+class _Worker(object):
+    def __init__(self, context, args):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_serve, args=(child,) + args, daemon=True)
+        self.process.start()
+        child.close()
+
+    def stop(self):
+        self.conn.close()
+        self.process.terminate()
+        self.process.join()
+
+
+class Sandbox(object):
+    """Runs every execution of the target in a worker process, reused from
+    one execution to the next, under a wall-clock timeout and optional
+    RLIMIT_CPU (seconds) and RLIMIT_AS (bytes) limits. The branches the
+    worker meets are replayed into the engine's constraint tree. An
+    execution that hits a limit returns a LimitExceeded; a worker that
+    dies or misses the timeout by GRACE seconds is restarted, and its
+    branches are lost. Executions are never run again in the engine: if
+    a branch does not pickle, the path is replayed up to it and counted
+    as cut short."""
+
+    GRACE = 1.0
+
+    def __init__(self, timeout=10.0, cpu=0, memory=0):
+        self.timeout = timeout
+        self.cpu = cpu
+        self.memory = memory
+        self.context = multiprocessing.get_context("fork")
+        self.worker = None
+        self.worker_args = None
+        self.coverage = None
+        self.stopped = {}
+        self.restarts = 0
+        # executions whose branches were not all sent back
+        self.cut_short = 0
+
+    def attach(self, invocation, coverage, locate):
+        self.coverage = coverage
+        self.worker_args = (invocation, coverage, locate, self.timeout, self.cpu, self.memory)
+
+    def run(self, path, inputs):
+        """Return value of the target on the concrete inputs, after
+        replaying its branches into path."""
+        w = self._worker()
+        w.conn.send(inputs)
+        wait = self.timeout + Sandbox.GRACE if self.timeout else None
+        if not w.conn.poll(wait):
+            self._restart()
+            return self._limit("timeout")
+        try:
+            outcome, events, lines, arcs, dropped = pickle.loads(w.conn.recv_bytes())
+        except EOFError:
+            self._restart()
+            return self._limit("crash")
+        if dropped:
+            log.warning("%d branches of %s did not pickle, the path is cut short", dropped, inputs)
+            self.cut_short += 1
+        self._replay(path, events)
+        if self.coverage is not None:
+            self.coverage.addExecution(lines, arcs)
+        if outcome[0] == "raise":
+            raise outcome[1]
+        if outcome[0] == "limit":
+            self.stopped[outcome[1]] = self.stopped.get(outcome[1], 0) + 1
+            return LimitExceeded(outcome[1])
+        return outcome[1]
+
+    def close(self):
+        if self.worker is not None:
+            self.worker.stop()
+            self.worker = None
+
+    def __str__(self):
+        stopped = ", ".join("%d %s" % (n, k) for k, n in sorted(self.stopped.items())) or "none"
+        return "executions stopped: %s; %d cut short; %d workers restarted" % (
+            stopped, self.cut_short, self.restarts)
+
+    # private
+
+    def _limit(self, kind):
+        self.stopped[kind] = self.stopped.get(kind, 0) + 1
+        if self.coverage is not None:
+            self.coverage.addExecution(set(), set())
+        return LimitExceeded(kind)
+
+    def _replay(self, path, events):
+        locate = path.locate
+        try:
+            for branch, symobj, site in events:
+                if branch is None:
+                    path.assume(symobj)
+                    continue
+                if locate is not None:
+                    path.locate = lambda: site
+                path.whichBranch(branch, symobj)
+        finally:
+            path.locate = locate
+
+    def _worker(self):
+        if self.worker is None or not self.worker.process.is_alive():
+            return self._restart()
+        return self.worker
+
+    def _restart(self):
+        if self.worker is not None:
+            self.restarts += 1
+            self.worker.stop()
+        self.worker = _Worker(self.context, self.worker_args)
+        return self.worker
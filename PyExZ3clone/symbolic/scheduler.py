@@ -0,0 +1,85 @@
+# Copyright: see copyright.txt
+
+import logging
+import sys
+
+from .frontier import PriorityFrontier
+
+log = logging.getLogger("se.scheduler")
+
+
+class CoverageScheduler:
+    """Coverage-guided frontier ordering driven by a static branch inventory
+    (see lib/conditions_extractor.py). Branch outcomes are tracked per source
+    line of the target module. A queued constraint is preferred when its own
+    outcome is still uncovered, then when its subtree can still reach an
+    uncovered outcome; exploration may stop once every outcome reachable from
+    the entry point that depends on the inputs has been covered. A line is
+    taken not to depend on them once it has run without a symbolic branch
+    being recorded there."""
+
+    # priorities, lower is better
+    UNCOVERED = 0
+    REACHES_UNCOVERED = 1
+    UNKNOWN = 2
+    COVERED = 3
+
+    def __init__(self, inventory, entry=None):
+        self.inventory = inventory
+        self.goals = inventory.reachable_outcomes(entry)
+        self.covered = set()
+        # lines where a symbolic branch was recorded, and lines that ran
+        self.symbolic = set()
+        self.executed = set()
+        # bumped whenever covered grows, which can only raise priorities
+        self.version = 0
+
+    def locate(self):
+        """Line of the target module whose branch is being evaluated, or None
+        if the branch happens outside of the module's branch sites."""
+        f = sys._getframe(1)
+        while f is not None:
+            if f.f_code.co_filename == self.inventory.filename:
+                return f.f_lineno if f.f_lineno in self.inventory.lines else None
+            f = f.f_back
+        return None
+
+    def newFrontier(self):
+        return PriorityFrontier(self.priority, lambda: self.version)
+
+    def recordPath(self, constraint, lines=None):
+        """Marks the outcomes along the path ending at constraint as covered;
+        lines are the lines of the target module the execution ran, if
+        known."""
+        covered = len(self.covered)
+        while constraint is not None and constraint.predicate is not None:
+            if constraint.site is not None:
+                self.covered.add((constraint.site, constraint.predicate.result))
+                self.symbolic.add(constraint.site)
+            constraint = constraint.parent
+        if lines is not None:
+            self.executed |= lines
+        if len(self.covered) != covered:
+            self.version += 1
+
+    def isComplete(self):
+        goals = self._inputGoals()
+        return len(goals) > 0 and goals <= self.covered
+
+    def priority(self, constraint):
+        if constraint.site is None:
+            return CoverageScheduler.UNKNOWN
+        if (constraint.site, constraint.predicate.result) not in self.covered:
+            return CoverageScheduler.UNCOVERED
+        for line in self.inventory.reach(constraint.site, constraint.predicate.result):
+            if not self.inventory.outcomes_at(line) <= self.covered:
+                return CoverageScheduler.REACHES_UNCOVERED
+        return CoverageScheduler.COVERED
+
+    def getCoverage(self):
+        goals = self._inputGoals()
+        return len(goals & self.covered), len(goals)
+
+    def _inputGoals(self):
+        # lines that ran without a symbolic branch only have concrete tests
+        return {g for g in self.goals if g[0] in self.symbolic or g[0] not in self.executed}
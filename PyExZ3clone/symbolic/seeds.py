@@ -0,0 +1,48 @@
+# Copyright: see copyright.txt
+
+import csv
+import json
+
+
+def loadSeeds(path, invocation):
+    """Input vectors of a seed corpus, as dictionaries by argument name.
+
+    A .json file holds a list of vectors, each an object by argument name
+    or a list of values in argument order. A .csv file has a header row of
+    argument names and one vector per row; a cell is read as JSON if it
+    parses (3, "a b", [1, 2]) and as a plain string otherwise. Arguments a
+    vector leaves out keep their initial value. Raises ValueError on an
+    unknown argument or a value of the wrong type."""
+    names = list(invocation.getNames())
+    if path.endswith(".csv"):
+        with open(path, newline="") as f:
+            rows = [{k: _parseCell(v) for k, v in row.items()} for row in csv.DictReader(f)]
+    else:
+        with open(path) as f:
+            rows = json.load(f)
+        if not isinstance(rows, list):
+            raise ValueError("%s: expected a list of input vectors" % path)
+        rows = [dict(zip(names, r)) if isinstance(r, list) else r for r in rows]
+
+    seeds = []
+    for i, row in enumerate(rows, 1):
+        seed = {}
+        for n in names:
+            init = invocation.initial_value[n]
+            v = row.get(n, init)
+            # bool is an int, but an int argument is not a bool one
+            if not isinstance(v, type(init)) or type(v) is bool and type(init) is not bool:
+                raise ValueError("%s: seed %d: %s should be of type %s, got %r" % (path, i, n, type(init).__name__, v))
+            seed[n] = v
+        unknown = set(row) - set(names)
+        if unknown:
+            raise ValueError("%s: seed %d: no argument named %s" % (path, i, ", ".join(sorted(unknown))))
+        seeds.append(seed)
+    return seeds
+
+
+def _parseCell(text):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
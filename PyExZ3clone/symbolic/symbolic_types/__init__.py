@@ -2,18 +2,22 @@
 
 from .symbolic_int import SymbolicInteger as SymInt
 from .symbolic_int import SymbolicObject as SymObj
+from .symbolic_bool import SymbolicBool as SymB
 from .symbolic_dict import SymbolicDict as SymD
 from .symbolic_str import SymbolicStr as SymS
+from .symbolic_list import SymbolicList as SymL
 from .symbolic_type import SymbolicType as SymType
 
-SymObj.wrap = lambda conc, sym : SymbolicInteger("se",conc,sym)
+SymObj.wrap = lambda conc, sym : SymbolicBool("se",conc,sym)
 SymbolicInteger = SymInt
+SymbolicBool = SymB
 SymbolicDict = SymD
 SymbolicStr = SymS
+SymbolicList = SymL
 SymbolicType = SymType
 
 def getSymbolic(v):
-	exported = [(int,SymbolicInteger),(dict,SymbolicDict),(str,SymbolicStr)]
+	exported = [(int,SymbolicInteger),(dict,SymbolicDict),(str,SymbolicStr),(list,SymbolicList)]
 	for (t,s) in exported:
 		if isinstance(v,t):
 			return s
@@ -0,0 +1,46 @@
+# limits.py
+# Caps on the growth of symbolic expressions, with automatic concretization.
+
+NONLINEAR_OPS = ("*", "//", "%")
+
+
+class ExpressionLimits:
+    """Limits on symbolic expressions built during an execution. An operation
+    whose result would be deeper than max_depth or larger than max_size
+    (in nodes) is concretized; with concretize_nonlinear, the right operand
+    of a *, // or % between two symbolic operands is concretized instead,
+    keeping the product linear. A limit of 0 means no limit.
+
+    Policies:
+      "assume" -- the concretization (value == concrete) is added to the path
+                  as an assumption, so later queries stay consistent with it
+      "free"   -- the symbolic value is dropped without an assumption; cheaper,
+                  but generated inputs may not follow the predicted path"""
+
+    POLICIES = ("assume", "free")
+
+    def __init__(self, max_depth=0, max_size=0, concretize_nonlinear=False, policy="assume"):
+        if policy not in ExpressionLimits.POLICIES:
+            raise Exception("Unknown concretization policy %s" % policy)
+        self.max_depth = max_depth
+        self.max_size = max_size
+        self.concretize_nonlinear = concretize_nonlinear
+        self.policy = policy
+        self.stats = {"depth": 0, "size": 0, "nonlinear": 0}
+
+    def isNonlinear(self, op, symbolic_operands):
+        return self.concretize_nonlinear and op in NONLINEAR_OPS and symbolic_operands > 1
+
+    def exceeded(self, depth, size):
+        """Name of the limit exceeded by an expression of that shape, or None."""
+        if self.max_depth and depth > self.max_depth:
+            return "depth"
+        if self.max_size and size > self.max_size:
+            return "size"
+        return None
+
+    def getConcretizations(self):
+        return sum(self.stats.values())
+
+    def __str__(self):
+        return ", ".join("%s: %d" % (k, v) for k, v in self.stats.items())
@@ -0,0 +1,88 @@
+# simplify.py
+# Rewrites applied while symbolic expressions are built, so that loop
+# updates such as y = y + 1 do not grow ever longer chains for the solver.
+# Only integer constants are rewritten, and comparisons of a boolean
+# expression with True or False; operands are already simplified.
+
+_COMMUTATIVE = {"+", "*", "&", "|", "^"}
+
+# (e op c1) op c2  ->  e op (c1 op' c2)
+_FOLD = {
+    "+": lambda a, b: a + b,
+    "*": lambda a, b: a * b,
+    "&": lambda a, b: a & b,
+    "|": lambda a, b: a | b,
+    "^": lambda a, b: a ^ b,
+}
+
+# identities: e op c -> e
+_NEUTRAL = {"+": 0, "*": 1, "|": 0, "^": 0}
+
+_FLIP = {"<": ">", ">": "<", "<=": ">=", ">=": "<=", "==": "==", "!=": "!="}
+
+_NEGATE = {"<": ">=", ">": "<=", "<=": ">", ">=": "<", "==": "!=", "!=": "=="}
+
+# operators whose result is a boolean (see SymbolicBool)
+_BOOLEAN = set(_NEGATE) | {"and", "or", "not", "in", "str.startswith", "dict.in"}
+
+
+def _isConst(e):
+    return type(e) is int
+
+
+def _isBoolExpr(e):
+    return isinstance(e, list) and e[0] in _BOOLEAN
+
+
+def negate(e):
+    """The negation of a boolean expression."""
+    if e[0] == "not":
+        return e[1]
+    if e[0] in _NEGATE:
+        return [_NEGATE[e[0]]] + e[1:]
+    return ["not", e]
+
+
+def simplify(expr):
+    """Returns the simplified [op, ...] expression, or a single operand
+    (variable or constant) when the operation reduces to it."""
+    if len(expr) != 3:
+        return expr
+    op, l, r = expr
+
+    # b == True -> b, b == False -> not b
+    if op in ("==", "!=") and type(l) is bool and _isBoolExpr(r):
+        l, r = r, l
+    if op in ("==", "!=") and type(r) is bool and _isBoolExpr(l):
+        return l if r == (op == "==") else negate(l)
+
+    # constants go to the right
+    if _isConst(l) and not _isConst(r):
+        if op in _COMMUTATIVE:
+            l, r = r, l
+        elif op in _FLIP:
+            op, l, r = _FLIP[op], r, l
+    if not _isConst(r) or _isConst(l):
+        return [op, l, r]
+
+    # subtracting a constant is adding its negation
+    if op == "-":
+        op, r = "+", -r
+
+    if op in _FOLD:
+        # collapse chains such as ((e + 1) + 2) into (e + 3)
+        while isinstance(l, list) and len(l) == 3 and l[0] == op and _isConst(l[2]):
+            l, r = l[1], _FOLD[op](l[2], r)
+        if op in _NEUTRAL and r == _NEUTRAL[op]:
+            return l
+        if op == "&" and r == -1:
+            return l
+        return [op, l, r]
+
+    if op in _FLIP:
+        # (e + c1) cmp c2  ->  e cmp (c2 - c1)
+        while isinstance(l, list) and len(l) == 3 and l[0] == "+" and _isConst(l[2]):
+            l, r = l[1], r - l[2]
+        return [op, l, r]
+
+    return [op, l, r]
@@ -0,0 +1,61 @@
+# symbolic_bool.py
+
+from .symbolic_int import SymbolicInteger
+
+
+def _isBool(x):
+    return isinstance(x, (bool, SymbolicBool))
+
+
+class SymbolicBool(SymbolicInteger):
+    """The result of a comparison, encoded as a solver Boolean instead of an
+    integer 0/1. Like Python's bool it is an int, so arithmetic on it is
+    the one of SymbolicInteger; &, | and ^ between two booleans build the
+    connectives "and", "or" and "!=", and comparing it with True or False
+    simplifies to itself or to its negation ("not")."""
+
+    def __new__(cls, name, v, expr=None):
+        return int.__new__(cls, v)
+
+    def __init__(self, name, v, expr=None):
+        super().__init__(name, bool(v), expr)
+
+    @staticmethod
+    def wrap(conc, sym):
+        return SymbolicBool("se", conc, sym)
+
+    def __hash__(self):
+        return hash(self.val)
+
+    def _bool_op(self, args, fun, op):
+        return self._do_sexpr(args, fun, op, SymbolicBool.wrap)
+
+    def __and__(self, other):
+        if not _isBool(other):
+            return SymbolicInteger.__and__(self, other)
+        return self._bool_op([self, other], lambda x, y: x & y, "and")
+
+    def __rand__(self, other):
+        if not _isBool(other):
+            return SymbolicInteger.__rand__(self, other)
+        return self._bool_op([other, self], lambda x, y: x & y, "and")
+
+    def __or__(self, other):
+        if not _isBool(other):
+            return SymbolicInteger.__or__(self, other)
+        return self._bool_op([self, other], lambda x, y: x | y, "or")
+
+    def __ror__(self, other):
+        if not _isBool(other):
+            return SymbolicInteger.__ror__(self, other)
+        return self._bool_op([other, self], lambda x, y: x | y, "or")
+
+    def __xor__(self, other):
+        if not _isBool(other):
+            return SymbolicInteger.__xor__(self, other)
+        return self._bool_op([self, other], lambda x, y: x != y, "!=")
+
+    def __rxor__(self, other):
+        if not _isBool(other):
+            return SymbolicInteger.__rxor__(self, other)
+        return self._bool_op([other, self], lambda x, y: x != y, "!=")
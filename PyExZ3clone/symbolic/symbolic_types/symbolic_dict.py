@@ -1,58 +1,215 @@
-import ast
-import sys
-from . symbolic_type import SymbolicObject
+from . symbolic_type import SymbolicObject, SymbolicType
+from . symbolic_int import SymbolicInteger
+from . symbolic_bool import SymbolicBool
+from . symbolic_list import _isInt, _sym
 
-# SymbolicDict: the key and values will both be SymbolicType for full generality
+# SymbolicDict: a dictionary input with symbolic integer keys and values.
+#
+# The input d is encoded as MAX_DICT_SIZE slots: slot j holds key
+# (dict.key d j) and value (dict.value d j), and the first (dict.len d)
+# slots are in the dictionary. The dictionary state is a term over the input,
+# extended on every update:
+#   term ::= d | (dict.set term k v) | (dict.del term k)
+# Lookups (dict.get term k) and membership tests (dict.in term k) are
+# expanded by the solver into ite-chains over the updates and the slots.
+#
+# Keys are stored concretely in the underlying dict, so that hashing and
+# comparisons done by dict itself do not record branches.
 
-# keys of dictionary must be immutable
-# values in dictionary may be mutable
+def _conc(x):
+	return x.getConcrValue() if isinstance(x, SymbolicType) else x
+
+
+class SymbolicMap(SymbolicType):
+	"""The slots of a dictionary input, as a leaf of symbolic expressions."""
+
+	def __init__(self, name, v):
+		SymbolicType.__init__(self, name)
+		self.val = v
+
+	def getConcrValue(self):
+		return self.val
 
 
-# TODO: big simplification: can only initialize with
-# an empty dictionary
 class SymbolicDict(SymbolicObject,dict):
 	def __new__(cls, name, *args, **kwargs):
-		self = dict.__new__(cls,args,kwargs)
-		return self
+		return dict.__new__(cls)
 
-	def __init__(self, name, kwargs):
+	def __init__(self, name, v):
 		SymbolicObject.__init__(self,name,None)
-		dict.__init__(self,kwargs)
+		v = dict(v)
+		# only int -> int dictionaries are encoded, others behave concretely
+		self.tracked = all(_isInt(k) and _isInt(x) for k,x in v.items())
+		self.base = SymbolicMap(name, v)
+		self.term = self.base
+		# symbolic key objects, by concrete key
+		self.keysym = {}
+		for j,(k,x) in enumerate(v.items()):
+			if self.tracked:
+				self.keysym[k] = SymbolicInteger.wrap(k, ["dict.key", self.base, j])
+				x = SymbolicInteger.wrap(x, ["dict.value", self.base, j])
+			dict.__setitem__(self, k, x)
+		self.length = SymbolicInteger.wrap(len(v), ["dict.len", self.base])
 
 	def getConcrValue(self):
-		return self
-		
+		return { k: _conc(x) for k,x in dict.items(self) }
+
+	def hasVars(self):
+		# the dictionary itself never enters an expression
+		return False
+
+	def unwrap(self):
+		conc = self.getConcrValue()
+		return (conc, conc)
+
+	def __len__(self):
+		return self.length if self.tracked else dict.__len__(self)
+
 	def __bool__(self):
-		return bool(len(self))
-
-#	def wrap(conc,sym):
-#		pass # TODO
-
-#	def __getitem__(self,key):
-#		val = super.__getitem__(key)
-#		if isinstance(val,SymbolicType):
-#			wrap = val.wrap
-#		else:
-#			wrap = lambda c,s : c
-#		return self._do_bin_op(key, lambda d, k: val, ast.Index, wrap)
-
-#	def __setitem__(self,key,value):
-#		# update the expression (this is a triple - not binary)
-#		concrete, symbolic =\
-#			self._do_sexpr([self,key,value], lambda d, k, v : d.super.__setitem__(k,v), ast.Store,\
-#					lambda c, s: c, s)
-#		# note that we do an in place update of 
-#                self.expr = symbolic
-
-#	def __contains__(self,key):
-#		for k in self.keys():
-#			if k == key:
-#				return True
-#		return False
-
-#	def __delitem__(self,key)
-#		if dict.__contains(self,key):
-#			pass
-#			# self.expr = Delete(self.expr,key)
-#		dict.__delitem__(self,key)
+		return bool(self.__len__() != 0)
+
+	def __contains__(self, key):
+		found = dict.__contains__(self, _conc(key))
+		if not self._tracks(key):
+			return found
+		return SymbolicBool.wrap(found, ["dict.in", self.term, _sym(key)])
+
+	def __getitem__(self, key):
+		# a branch on membership, so that the KeyError path is explored too
+		if not self._member(key):
+			raise KeyError(key)
+		return self._value(key)
+
+	def __setitem__(self, key, value):
+		self._store(key, value, not self._member(key))
+
+	def __delitem__(self, key):
+		if not self._member(key):
+			raise KeyError(key)
+		self._remove(key)
+
+	def __iter__(self):
+		# the loop condition is a branch on the symbolic length
+		keys = [ self.keysym.get(k, k) for k in dict.keys(self) ]
+		j = 0
+		while j < self.__len__():
+			yield keys[j]
+			j += 1
+
+	def __eq__(self, other):
+		if not isinstance(other, dict):
+			return False
+		if self.__len__() != other.__len__():
+			return False
+		for k in dict.keys(other):
+			if not self._member(k) or self._value(k) != other[k]:
+				return False
+		return True
+
+	def __ne__(self, other):
+		return not self.__eq__(other)
+
+	__hash__ = None
+
+	def keys(self):
+		return [ k for k in self ]
+
+	def values(self):
+		return [ self._value(k) for k in self ]
+
+	def items(self):
+		return [ (k, self._value(k)) for k in self ]
+
+	def get(self, key, default=None):
+		if self._member(key):
+			return self._value(key)
+		return default
+
+	def setdefault(self, key, default=None):
+		if self._member(key):
+			return self._value(key)
+		self._store(key, default, True)
+		return default
+
+	def pop(self, key, *default):
+		if self._member(key):
+			value = self._value(key)
+			self._remove(key)
+			return value
+		if default:
+			return default[0]
+		raise KeyError(key)
+
+	def update(self, other=(), **kwargs):
+		pairs = other.items() if isinstance(other, dict) else other
+		for k,v in list(pairs) + list(kwargs.items()):
+			self[k] = v
+
+	def __ior__(self, other):
+		self.update(other)
+		return self
+
+	def __or__(self, other):
+		if not isinstance(other, dict):
+			return NotImplemented
+		c = self.copy()
+		c.update(other)
+		return c
+
+	def clear(self):
+		for k in list(dict.keys(self)):
+			self._remove(self.keysym.get(k, k))
+
+	def popitem(self):
+		# the last key inserted, as dict does; a branch on the length first
+		if not self:
+			raise KeyError("popitem(): dictionary is empty")
+		k = next(reversed(dict.keys(self)))
+		key = self.keysym.get(k, k)
+		value = self._value(key)
+		self._remove(key)
+		return (key, value)
+
+	def copy(self):
+		# shares the immutable terms; later updates extend them separately
+		c = SymbolicDict.__new__(SymbolicDict, self.name)
+		SymbolicObject.__init__(c, self.name, None)
+		c.tracked = self.tracked
+		c.base = self.base
+		c.term = self.term
+		c.keysym = dict(self.keysym)
+		c.length = self.length
+		dict.update(c, dict.items(self))
+		return c
+
+	# -- private
+
+	def _tracks(self, key):
+		return self.tracked and _isInt(key)
+
+	def _member(self, key):
+		return bool(self.__contains__(key))
+
+	def _value(self, key):
+		value = dict.__getitem__(self, _conc(key))
+		if not self._tracks(key):
+			return value
+		return SymbolicInteger.wrap(_conc(value), ["dict.get", self.term, _sym(key)])
+
+	def _store(self, key, value, new):
+		if self.tracked and not (_isInt(key) and _isInt(value)):
+			self.tracked = False
+		if self.tracked:
+			if new:
+				self.length = self.length + 1
+			self.term = ["dict.set", self.term, _sym(key), _sym(value)]
+		if new:
+			self.keysym[_conc(key)] = key
+		dict.__setitem__(self, _conc(key), value)
 
+	def _remove(self, key):
+		dict.__delitem__(self, _conc(key))
+		if self._tracks(key):
+			self.term = ["dict.del", self.term, _sym(key)]
+			self.length = self.length - 1
+		self.keysym.pop(_conc(key), None)
@@ -11,6 +11,9 @@ class SymbolicInteger(SymbolicObject, int):
         super().__init__(name, expr)
         self.val = v
 
+    def __getnewargs__(self):
+        return (self.name, self.val)
+
     def getConcrValue(self):
         return self.val
 
@@ -0,0 +1,174 @@
+# symbolic_list.py
+
+from .symbolic_type import SymbolicObject, SymbolicType
+from .symbolic_int import SymbolicInteger
+
+
+def _isInt(x):
+    return type(x) is int or isinstance(x, SymbolicInteger)
+
+
+def _sym(x):
+    return x.unwrap()[1] if isinstance(x, SymbolicType) and x.hasVars() else x
+
+
+class SymbolicArray(SymbolicType):
+    """The array variable of a list input, as a leaf of symbolic expressions."""
+
+    def __init__(self, name, v):
+        SymbolicType.__init__(self, name)
+        self.val = v
+
+    def getConcrValue(self):
+        return self.val
+
+
+class SymbolicList(SymbolicObject, list):
+    """A list input with symbolic length and integer contents, encoded as an
+    SMT array l: element k of the input is (select l k) and its length is
+    (list.len l). Beside the concrete elements the list keeps the array term
+    of its current contents, extended with a store on every write, so reads
+    and writes at symbolic indexes are exact. Elements that are not integers
+    stay concrete. The list itself never enters an expression: its elements
+    and its length carry the symbolic values."""
+
+    def __new__(cls, name, v, expr=None):
+        return list.__new__(cls)
+
+    def __init__(self, name, v, expr=None):
+        SymbolicObject.__init__(self, name, None)
+        self.base = SymbolicArray(name, list(v))
+        list.__init__(self, [self._element(self.base, k, x) for k, x in enumerate(v)])
+        self.array = self.base
+        self.length = SymbolicInteger.wrap(len(v), ["list.len", self.base])
+
+    def getConcrValue(self):
+        return [x.getConcrValue() if isinstance(x, SymbolicType) else x for x in list.__iter__(self)]
+
+    def hasVars(self):
+        return False
+
+    def unwrap(self):
+        conc = self.getConcrValue()
+        return (conc, conc)
+
+    @staticmethod
+    def _element(array, k, x):
+        if _isInt(x):
+            return SymbolicInteger.wrap(int(x), ["select", array, k])
+        return x
+
+    def __len__(self):
+        return self.length
+
+    def __bool__(self):
+        return bool(self.length != 0)
+
+    def __iter__(self):
+        # the loop condition is a branch on the symbolic length
+        k = 0
+        while k < self.length:
+            yield list.__getitem__(self, k)
+            k += 1
+
+    def __eq__(self, other):
+        if not isinstance(other, list):
+            return False
+        if self.length != other.__len__():
+            return False
+        return all(a == b for a, b in zip(list.__iter__(self), list.__iter__(other)))
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = None
+    __lt__ = list.__lt__
+    __le__ = list.__le__
+    __gt__ = list.__gt__
+    __ge__ = list.__ge__
+
+    def __getitem__(self, key):
+        if not isinstance(key, SymbolicType) or not key.hasVars():
+            return list.__getitem__(self, key)
+        i = self._index(key)
+        x = list.__getitem__(self, i.getConcrValue())
+        if not _isInt(x):
+            return x
+        return SymbolicInteger.wrap(int(x), ["select", self.array, _sym(i)])
+
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            n = list.__len__(self)
+            list.__setitem__(self, key, value)
+            self._rebuild(list.__len__(self) - n)
+            return
+        symbolic_key = isinstance(key, SymbolicType) and key.hasVars()
+        i = self._index(key) if symbolic_key else key
+        k = int(i)
+        if k < 0:
+            k += list.__len__(self)
+        list.__setitem__(self, k, value)
+        if _isInt(value):
+            self.array = ["store", self.array, _sym(i) if symbolic_key else k, _sym(value)]
+        if symbolic_key:
+            # the store may hit any position: reread every element from the array
+            for j, x in enumerate(list.__iter__(self)):
+                if j != k and _isInt(x):
+                    list.__setitem__(self, j, self._element(self.array, j, x))
+
+    def append(self, value):
+        if _isInt(value):
+            self.array = ["store", self.array, _sym(self.length), _sym(value)]
+        list.append(self, value)
+        self.length = self.length + 1
+
+    def pop(self, index=-1):
+        last = index == -1 or index == list.__len__(self) - 1
+        value = list.pop(self, index)
+        if last:
+            self.length = self.length - 1
+        else:
+            self._rebuild(-1)
+        return value
+
+    # other mutations re-encode the current contents
+
+    def _mutator(method):
+        def mutate(self, *args, **kwargs):
+            n = list.__len__(self)
+            ret = method(self, *args, **kwargs)
+            self._rebuild(list.__len__(self) - n)
+            return ret
+        mutate.__name__ = method.__name__
+        return mutate
+
+    insert = _mutator(list.insert)
+    remove = _mutator(list.remove)
+    extend = _mutator(list.extend)
+    clear = _mutator(list.clear)
+    sort = _mutator(list.sort)
+    reverse = _mutator(list.reverse)
+    __delitem__ = _mutator(list.__delitem__)
+    __imul__ = _mutator(list.__imul__)
+    del _mutator
+
+    def __iadd__(self, other):
+        self.extend(other)
+        return self
+
+    def _rebuild(self, delta=0):
+        array = self.base
+        for k, x in enumerate(list.__iter__(self)):
+            if _isInt(x):
+                array = ["store", array, k, _sym(x)]
+        self.array = array
+        if delta != 0:
+            self.length = self.length + delta
+
+    def _index(self, i):
+        # Python's negative indexing and bounds check, as recorded branches
+        if i < 0:
+            i = i + self.length
+        if i < 0 or i >= self.length:
+            raise IndexError("list index out of range")
+        return i
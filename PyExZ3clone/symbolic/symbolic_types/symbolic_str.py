@@ -1,5 +1,6 @@
 from . symbolic_type import SymbolicObject
 from symbolic.symbolic_types.symbolic_int import SymbolicInteger
+from symbolic.symbolic_types.symbolic_bool import SymbolicBool
 from string import whitespace
 
 class SymbolicStr(SymbolicObject, str):
@@ -11,6 +12,9 @@ class SymbolicStr(SymbolicObject, str):
         SymbolicObject.__init__(self, name, expr)
         self.val = v
 
+    def __getnewargs__(self):
+        return (self.name, self.val)
+
     def getConcrValue(self):
         return self.val
 
@@ -24,7 +28,10 @@ class SymbolicStr(SymbolicObject, str):
         return self._do_sexpr(args, fun, op, SymbolicStr.wrap)
 
     def __bool__(self):
-        return SymbolicObject.__bool__(self.__len__() != 0)
+        nonempty = self.__len__() != 0
+        if isinstance(nonempty, SymbolicObject):
+            return SymbolicObject.__bool__(nonempty)
+        return nonempty
 
     def __len__(self):
         return self._do_sexpr([self], lambda x: len(x),
@@ -32,7 +39,7 @@ class SymbolicStr(SymbolicObject, str):
 
     def __contains__(self, item):
         return self._do_sexpr([self, item], lambda x, y: str.__contains__(x, y),
-                                "in", SymbolicInteger.wrap)
+                                "in", SymbolicBool.wrap)
 
     def __getitem__(self, key):
         """Negative indexes, out of bound slices, and slice skips are not currently supported."""
@@ -52,44 +59,63 @@ class SymbolicStr(SymbolicObject, str):
     def startswith(self, prefix):
         return self._do_sexpr([self, prefix],
                               lambda x, y: str.startswith(x, y),
-                              "str.startswith", SymbolicInteger.wrap)
+                              "str.startswith", SymbolicBool.wrap)
 
-    def split(self, sep=None, maxsplit=None):
+    def split(self, sep=None, maxsplit=-1):
+        """With an explicit separator, the number of pieces is decided by one
+        branch on the (native) count of separators and the pieces are slices
+        between native finds. Splitting on whitespace (sep=None) is
+        implemented as a recurrence of finds on " "."""
         if sep is None:
-            sep = " "
-        if len(self) == 0:
+            return self._splitSpaces(maxsplit)
+        if sep.__len__() == 0:
+            raise ValueError("empty separator")
+        count = self.count(sep)
+        if maxsplit is not None and maxsplit >= 0 and count > maxsplit:
+            pieces = maxsplit
+        else:
+            pieces = count.getConcrValue() if isinstance(count, SymbolicInteger) else count
+            # fixes the number of pieces on this path
+            bool(count == pieces)
+        ret = []
+        start = 0
+        for _ in range(pieces):
+            sep_idx = self.find(sep, start)
+            ret.append(self[start:sep_idx])
+            start = sep_idx + sep.__len__()
+        ret.append(self[start:])
+        return ret
+
+    def _splitSpaces(self, maxsplit):
+        if self.__len__() == 0:
             return []
-        elif maxsplit == 0 or sep not in self:
+        elif maxsplit == 0 or " " not in self:
             return [self]
         else:
-            sep_idx = self.find(sep)
-            maxsplit = None if maxsplit is None else maxsplit - 1
+            sep_idx = self.find(" ")
+            maxsplit = -1 if maxsplit is None or maxsplit < 0 else maxsplit - 1
             return [self[0:sep_idx]] + \
-                   self[sep_idx + 1:].split(sep, maxsplit)
+                   self[sep_idx + 1:]._splitSpaces(maxsplit)
 
     def count(self, sub):
-        """String count is not a native function of the SMT solver. Instead, we implement count as a recursive series of
-        find operations. Note that not all of the functionality of count is supported at this time, such as the start
-        index."""
-        if sub not in self:
-            ret = 0
-        elif sub == "":
-            ret = self.__len__() + 1
-        else:
-            find_idx = self.find(sub)
-            reststr = self[find_idx + sub.__len__():]
-            ret = reststr.count(sub) + 1
-        assert int(ret) == str.count(str(self), str(sub))
-        return ret
+        """Encoded natively (a bounded chain of finds for Z3, the length
+        removed by replace_all for CVC) instead of one branch per occurrence.
+        The start and end arguments are not supported."""
+        return self._do_sexpr([self, sub], lambda x, y: str.count(x, y),
+                              "str.count", SymbolicInteger.wrap)
 
     def _replace(self, old, new):
-        return self._do_sexpr([self, old, new], lambda x, y, z: str.replace(x, y, z),
+        return self._do_sexpr([self, old, new], lambda x, y, z: str.replace(x, y, z, 1),
                               "str.replace", SymbolicStr.wrap)
 
     def replace(self, old, new, maxreplace=-1):
-        """CVC only replaces the first occurrence of old with new
-        (maxreplace=1). For this reason, SymbolicStr's replace is implemented
-        as a recurrence of single replaces."""
+        """Replacing every occurrence is encoded natively (str.replace_all).
+        The SMT replace only replaces the first occurrence of old with new,
+        so a bounded maxreplace is implemented as a recurrence of single
+        replaces."""
+        if maxreplace < 0:
+            return self._do_sexpr([self, old, new], lambda x, y, z: str.replace(x, y, z),
+                                  "str.replace_all", SymbolicStr.wrap)
         if maxreplace == 0 or old not in self:
             ret = self
         else:
@@ -102,16 +128,25 @@ class SymbolicStr(SymbolicObject, str):
         return ret
 
     def strip(self, chars=None):
+        """Encoded natively for a concrete set of characters: the result t is
+        constrained by self == p + t + q, with p and q made of chars and t
+        empty or neither starting nor ending with one of them."""
         if chars is None:
             chars = whitespace
+        if isinstance(chars, SymbolicObject):
+            return self._stripChars(chars)
+        return self._do_sexpr([self, chars], lambda x, y: str.strip(x, y),
+                              "str.strip", SymbolicStr.wrap)
+
+    def _stripChars(self, chars):
         if self.__len__() == 0:
             return self
         for char in chars:
             if self[0] == char:
-                return self[1:].strip(chars)
+                return self[1:]._stripChars(chars)
         for char in chars:
             if self[self.__len__() - 1] == char:
-                return self[:self.__len__() - 1].strip(chars)
+                return self[:self.__len__() - 1]._stripChars(chars)
         return self
 
 # Currently only a subset of string operations are supported.
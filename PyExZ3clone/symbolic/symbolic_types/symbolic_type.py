@@ -3,13 +3,32 @@
 import inspect
 import functools
 
+from .simplify import simplify
+
 # the ABSTRACT base class for representing any expression that depends on a symbolic input
 # it also tracks the corresponding concrete value for the expression (aka concolic execution)
 
 class SymbolicType(object):
+    limits = None  # ExpressionLimits, set by ExplorationEngine
+    eager = None  # builder of solver terms (Z3EagerTerms), set by ExplorationEngine
+    # solver term of the value and names of its variables, if built eagerly
+    term = None
+    term_vars = frozenset()
+
     def __init__(self, name, expr=None):
         self.name = name
         self.expr = expr
+        self._has_vars = None
+        # shape of the expression, maintained only while limits are set
+        self._depth = 1
+        self._size = 1
+
+    def __getstate__(self):
+        # eagerly built solver terms do not leave the process (see portfolio.py)
+        state = dict(self.__dict__)
+        state.pop("term", None)
+        state.pop("term_vars", None)
+        return state
 
     def getConcrValue(self):
         raise NotImplemented()
@@ -27,6 +46,19 @@ class SymbolicType(object):
         else:
             return (self.getConcrValue(), self.expr)
 
+    def hasVars(self):
+        """True if the value depends on at least one symbolic input."""
+        if self.isVariable():
+            return True
+        if self._has_vars is None:
+            self._has_vars = self._hasVarLeaves(self.expr)
+        return self._has_vars
+
+    def _hasVarLeaves(self, e):
+        if isinstance(e, list):
+            return any(self._hasVarLeaves(a) for a in e[1:])
+        return isinstance(e, SymbolicType)
+
     def getVars(self):
         if self.isVariable():
             return [self.name]
@@ -44,16 +76,80 @@ class SymbolicType(object):
             return []
 
     def _do_sexpr(self, args, fun, op, wrap):
-        # Unwrap arguments to (concrete, symbolic) pairs
-        unwrapped = [(a.unwrap() if isinstance(a, SymbolicType) else (a, a)) for a in args]
+        # Unwrap arguments to (concrete, symbolic) pairs; operands that do
+        # not depend on an input enter the expression as constants
+        unwrapped = []
+        concrete_only = True
+        for a in args:
+            if isinstance(a, SymbolicType) and a.hasVars():
+                unwrapped.append(a.unwrap())
+                concrete_only = False
+            elif isinstance(a, SymbolicType):
+                unwrapped.append((a.getConcrValue(), a.getConcrValue()))
+            else:
+                unwrapped.append((a, a))
         # Use getfullargspec for Python 3
         spec = inspect.getfullargspec(fun).args
         # Map argument names to concrete values
         concrete_args = {name: val for name, (val, _) in zip(spec, unwrapped)}
         concrete = fun(**concrete_args)
+        # no operand depends on an input: plain concrete evaluation
+        if concrete_only:
+            return concrete
+        limits = SymbolicType.limits
+        if limits is not None:
+            symbolic_args = [a for a in args if isinstance(a, SymbolicType) and a.hasVars()]
+            if limits.isNonlinear(op, len(symbolic_args)):
+                # keep the product linear: pin the right operand to its value
+                limits.stats["nonlinear"] += 1
+                self._concretize(args[-1], unwrapped[-1][0])
+                unwrapped[-1] = (unwrapped[-1][0], unwrapped[-1][0])
         # Build symbolic expression list: [op, *symbolic parts]
-        symbolic = [op] + [sym for (_, sym) in unwrapped]
-        return wrap(concrete, symbolic)
+        symbolic = simplify([op] + [sym for (_, sym) in unwrapped])
+        if isinstance(symbolic, SymbolicType):
+            # reduced to one of the input variables, e.g. (x + 3) - 3
+            return symbolic
+        result = wrap(concrete, symbolic)
+        result._has_vars = True
+        if limits is not None:
+            # the shape of the kept expression, once simplified
+            depth, size = self._shape(symbolic, {id(a.expr): (a._depth, a._size) for a in symbolic_args
+                                                    if isinstance(a.expr, list)})
+            reason = limits.exceeded(depth, size)
+            if reason is not None:
+                limits.stats[reason] += 1
+                self._concretize(result, concrete)
+                return concrete
+            result._depth, result._size = depth, size
+        if SymbolicType.eager is not None:
+            # operands enter as values (carrying their terms) or constants
+            operands = [a if isinstance(sym, (list, SymbolicType)) else sym
+                        for a, (_, sym) in zip(args, unwrapped)]
+            built = SymbolicType.eager.build(op, operands)
+            if built is not None:
+                result.term, result.term_vars = built
+        return result
+
+    @staticmethod
+    def _shape(expr, known):
+        """(depth, size) of expr; known gives those of the operands'
+        expressions, which simplify may have kept whole or taken apart."""
+        if isinstance(expr, SymbolicType):
+            return (1, 1)
+        if not isinstance(expr, list):
+            return (0, 1)
+        shape = known.get(id(expr))
+        if shape is None:
+            shapes = [SymbolicType._shape(a, known) for a in expr[1:]]
+            shape = (1 + max(d for d, _ in shapes), 1 + sum(n for _, n in shapes))
+        return shape
+
+    @staticmethod
+    def _concretize(value, concrete):
+        # under the "assume" policy the path records value == concrete, so
+        # that inputs solved for later branches keep the value it had here
+        if SymbolicType.limits.policy == "assume" and SymbolicObject.SI is not None:
+            SymbolicObject.SI.assume(SymbolicObject.wrap(True, ["==", value.unwrap()[1], concrete]))
 
     def symbolicEq(self, other):
         if not isinstance(other, SymbolicType):
@@ -96,7 +192,8 @@ class SymbolicObject(SymbolicType):
 
     def __bool__(self):
         concrete = bool(self.getConcrValue())
-        if SymbolicObject.SI is not None:
+        # branches on values that do not depend on inputs are not recorded
+        if SymbolicObject.SI is not None and self.hasVars():
             SymbolicObject.SI.whichBranch(concrete, self)
         return concrete
 
@@ -12,5 +12,8 @@ class Z3BitVector(Z3Expression):
 	def _variable(self,name,solver):
 		return BitVec(name,self.N,solver.ctx)
 
+	def _arrayVariable(self,name,solver):
+		return Array(name,BitVecSort(self.N,solver.ctx),BitVecSort(self.N,solver.ctx))
+
 	def _constant(self,v,solver):
 		return BitVecVal(v,self.N,solver.ctx)
@@ -0,0 +1,60 @@
+from z3 import *
+from symbolic.symbolic_types.symbolic_int import SymbolicInteger
+from symbolic.symbolic_types.symbolic_type import SymbolicType
+from .integer import Z3Integer
+
+class Z3EagerTerms(object):
+	"""Builds the Z3 term (over unbounded integers) of a symbolic operation
+	   while it runs, from the terms of its operands (see
+	   SymbolicType._do_sexpr). Z3Integer then uses the term of a value
+	   instead of translating its expression. Only operations on integers
+	   and Booleans are built: any other leaves its result, and whatever is
+	   computed from it, to the translation."""
+
+	OPS = { "+", "-", "*", "//", "%", "<<", ">>", "^", "|", "&",
+		"==", "!=", "<", ">", "<=", ">=", "and", "or", "not" }
+
+	# operators applied directly to two integer terms
+	DIRECT = {
+		"+": lambda l, r: l + r,
+		"-": lambda l, r: l - r,
+		"*": lambda l, r: l * r,
+		"//": lambda l, r: l / r,
+		"==": lambda l, r: l == r,
+		"!=": lambda l, r: l != r,
+		"<": lambda l, r: l < r,
+		">": lambda l, r: l > r,
+		"<=": lambda l, r: l <= r,
+		">=": lambda l, r: l >= r,
+	}
+
+	def __init__(self):
+		self.solver = Solver()
+		self.z3_expr = Z3Integer()
+		self.built = 0
+
+	def build(self,op,operands):
+		"""(term, names of its variables) of op applied to operands, or None."""
+		if op not in self.OPS:
+			return None
+		terms = []
+		names = set()
+		for a in operands:
+			if isinstance(a,SymbolicType):
+				if a.isVariable() and type(a) is SymbolicInteger:
+					terms.append(self.z3_expr._variable(a.name,self.solver))
+					names.add(a.name)
+				elif a.term is not None:
+					terms.append(a.term)
+					names |= a.term_vars
+				else:
+					return None
+			elif isinstance(a,int):
+				terms.append(a)
+			else:
+				return None
+		self.built += 1
+		if op in self.DIRECT and not any(isinstance(t,(bool,BoolRef)) for t in terms):
+			l,r = [ t if isinstance(t,ExprRef) else IntVal(t,self.solver.ctx) for t in terms ]
+			return (self.DIRECT[op](l,r),frozenset(names))
+		return (self.z3_expr._astToZ3Expr([op] + terms,self.solver),frozenset(names))
@@ -1,18 +1,52 @@
 import utils
 
 from symbolic.symbolic_types.symbolic_int import SymbolicInteger
+from symbolic.symbolic_types.symbolic_str import SymbolicStr
 from symbolic.symbolic_types.symbolic_type import SymbolicType
+from symbolic.symbolic_types.symbolic_list import SymbolicArray
+from symbolic.symbolic_types.symbolic_dict import SymbolicMap
 from z3 import *
 
 class Z3Expression(object):
+	# upper bounds on the size of generated list and dictionary inputs
+	MAX_LIST_LENGTH = 16
+	MAX_DICT_SIZE = 8
+	# use the terms of Z3EagerTerms (only valid over unbounded integers)
+	EAGER_TERMS = False
+
 	def __init__(self):
 		self.z3_vars = {}
+		self.z3_arrays = {}
+		self.z3_maps = {}
+		self.z3_strings = set()
+		self.trackers = {}
+		# auxiliary variables of native string encodings
+		self.z3_aux = 0
 
 	def toZ3(self,solver,asserts,query):
 		self.z3_vars = {}
+		self.z3_arrays = {}
+		self.z3_maps = {}
+		self.z3_strings = set()
 		solver.assert_exprs([self.predToZ3(p,solver) for p in asserts])
 		solver.assert_exprs(Not(self.predToZ3(query,solver)))
 
+	def toZ3Tracked(self,solver,asserts,query):
+		"""Like toZ3, but every predicate is asserted under its own tracking
+		   literal so that an unsat core can be mapped back to predicates."""
+		self.z3_vars = {}
+		self.z3_arrays = {}
+		self.z3_maps = {}
+		self.z3_strings = set()
+		self.trackers = {}
+		for i,p in enumerate(asserts):
+			self._assertTracked(solver,"__assert_%d" % i,self.predToZ3(p,solver),p)
+		self._assertTracked(solver,"__query",Not(self.predToZ3(query,solver)),query)
+
+	def getUnsatCore(self,solver):
+		"""Predicates of the unsat core of the last tracked check."""
+		return [ self.trackers[str(t)] for t in solver.unsat_core() ]
+
 	def predToZ3(self,pred,solver,env=None):
 		sym_expr = self._astToZ3Expr(pred.symtype,solver,env)
 		if env == None:
@@ -28,11 +62,50 @@ class Z3Expression(object):
 	def getIntVars(self):
 		return [ v[1] for v in self.z3_vars.items() if self._isIntVar(v[1]) ]
 
+	def getValue(self,ce):
+		"""Python value of a value of a Z3 model, None if it is not one."""
+		if is_string_value(ce):
+			return ce.as_string()
+		elif is_bv_value(ce):
+			return ce.as_signed_long()
+		elif is_int_value(ce):
+			return ce.as_long()
+		return None
+
+	def getListModel(self,model,solver):
+		"""Concrete values of the list inputs in model, by name."""
+		res = {}
+		for name,(array,length) in self.z3_arrays.items():
+			n = self._modelValue(model,length)
+			res[name] = [ self._modelValue(model,Select(array,self._constant(k,solver))) for k in range(n) ]
+		return res
+
+	def getDictModel(self,model,solver):
+		"""Concrete values of the dictionary inputs in model, by name."""
+		res = {}
+		for name,(keys,values,size,_) in self.z3_maps.items():
+			res[name] = {}
+			for j in range(self._modelValue(model,size)):
+				k = self._modelValue(model,Select(keys,self._constant(j,solver)))
+				res[name][k] = self._modelValue(model,Select(values,self._constant(j,solver)))
+		return res
+
 	# ----------- private ---------------
 
+	def _assertTracked(self,solver,name,expr,pred):
+		self.trackers[name] = pred
+		solver.assert_and_track(expr,Bool(name,solver.ctx))
+
 	def _isIntVar(self, v):
 		raise NotImplementedException
 
+	def _getStringVariable(self,name,solver):
+		# strings are only encoded over unbounded integers (see Z3Wrapper)
+		if name not in self.z3_vars:
+			self.z3_vars[name] = String(name,solver.ctx)
+			self.z3_strings.add(name)
+		return self.z3_vars[name]
+
 	def _getIntegerVariable(self,name,solver):
 		if name not in self.z3_vars:
 			self.z3_vars[name] = self._variable(name,solver)
@@ -41,21 +114,119 @@ class Z3Expression(object):
 	def _variable(self,name,solver):
 		raise NotImplementedException
 
+	def _arrayVariable(self,name,solver):
+		raise NotImplementedException
+
+	def _getArrayVariable(self,leaf,solver):
+		# a list input is an array plus its length, bounded by MAX_LIST_LENGTH
+		# (or the length of the initial input, if longer)
+		if leaf.name not in self.z3_arrays:
+			length = self._variable(leaf.name + ".len",solver)
+			self.z3_arrays[leaf.name] = (self._arrayVariable(leaf.name,solver),length)
+			self._assertSize(length,max(self.MAX_LIST_LENGTH,len(leaf.val)),solver)
+		return self.z3_arrays[leaf.name]
+
+	def _getMapVariable(self,leaf,solver):
+		# a dictionary input is an array of keys, one of values and a size;
+		# the keys of the slots in use are distinct
+		if leaf.name not in self.z3_maps:
+			slots = max(self.MAX_DICT_SIZE,len(leaf.val))
+			keys = self._arrayVariable(leaf.name + ".keys",solver)
+			values = self._arrayVariable(leaf.name + ".values",solver)
+			size = self._variable(leaf.name + ".len",solver)
+			self.z3_maps[leaf.name] = (keys,values,size,slots)
+			self._assertSize(size,slots,solver)
+			for j in range(1,slots):
+				in_use = self._constant(j,solver) < size
+				for i in range(j):
+					k_i = Select(keys,self._constant(i,solver))
+					k_j = Select(keys,self._constant(j,solver))
+					solver.add(Implies(in_use,k_i != k_j))
+		return self.z3_maps[leaf.name]
+
+	def _assertSize(self,size,bound,solver):
+		solver.add(self._constant(0,solver) <= size, size <= self._constant(bound,solver))
+
+	def _modelValue(self,model,e):
+		return self.getValue(model.eval(e,model_completion=True))
+
+	def _dictLookup(self,term,key,solver,env):
+		"""(membership, value) of key in a dictionary term: an ite-chain
+		   over the updates of the term, then over the slots of the input."""
+		if isinstance(term,SymbolicMap):
+			if env != None:
+				d = env[term.name]
+				return (key in d, d.get(key,0))
+			keys,values,size,slots = self._getMapVariable(term,solver)
+			member = BoolVal(False,solver.ctx)
+			value = self._constant(0,solver)
+			for j in reversed(range(slots)):
+				hit = And(self._constant(j,solver) < size, Select(keys,self._constant(j,solver)) == key)
+				member = Or(hit,member)
+				value = If(hit,Select(values,self._constant(j,solver)),value)
+			return (member,value)
+		member,value = self._dictLookup(term[1],key,solver,env)
+		k = self._astToZ3Expr(term[2],solver,env)
+		if term[0] == "dict.set":
+			v = self._astToZ3Expr(term[3],solver,env)
+			if env != None:
+				return (True,v) if k == key else (member,value)
+			return (Or(k == key,member),If(k == key,v,value))
+		elif term[0] == "dict.del":
+			if env != None:
+				return (False,0) if k == key else (member,value)
+			return (And(k != key,member),value)
+		utils.crash("Unknown dictionary term during conversion to Z3: %s" % term[0])
+
+	def _dictSlot(self,op,leaf,j,solver,env):
+		if env != None:
+			d = env[leaf.name]
+			if op == "dict.len":
+				return len(d)
+			slots = list(d.keys() if op == "dict.key" else d.values())
+			return slots[j] if j < len(slots) else 0
+		keys,values,size,_ = self._getMapVariable(leaf,solver)
+		if op == "dict.len":
+			return size
+		return Select(keys if op == "dict.key" else values,self._constant(j,solver))
+
 	def _constant(self,v,solver):
 		raise NotImplementedException
 
 	def _wrapIf(self,e,solver,env):
-		if env == None:
+		if env == None and isinstance(e,BoolRef):
 			return If(e,self._constant(1,solver),self._constant(0,solver))
 		else:
 			return e
 
+	def _coerce(self,op,args,solver):
+		"""Comparisons are Booleans (see SymbolicBool); as operands of an
+		   operator on integers, and compared with one, they count as 1 or 0."""
+		if op in ("and","or","not"):
+			return args
+		if op in ("==","!=") and all(isinstance(a,BoolRef) for a in args):
+			return args
+		return [ self._wrapIf(a,solver,None) for a in args ]
+
 	# add concrete evaluation to this, to check
 	def _astToZ3Expr(self,expr,solver,env=None):
 		if isinstance(expr, list):
 			op = expr[0]
+			if op == "list.len":
+				if env == None:
+					return self._getArrayVariable(expr[1],solver)[1]
+				return len(env[expr[1].name])
+			elif op in ("dict.len","dict.key","dict.value"):
+				return self._dictSlot(op,expr[1],expr[2] if len(expr) > 2 else None,solver,env)
+			elif op in ("dict.get","dict.in"):
+				key = self._wrapIf(self._astToZ3Expr(expr[2],solver,env),solver,env)
+				member,value = self._dictLookup(expr[1],key,solver,env)
+				return value if op == "dict.get" else member
 			args = [ self._astToZ3Expr(a,solver,env) for a in expr[1:] ]
-			z3_l,z3_r = args[0],args[1]
+			if env == None:
+				args = self._coerce(op,args,solver)
+			z3_l = args[0]
+			z3_r = args[1] if len(args) > 1 else None
 
 			# arithmetical operations
 			if op == "+":
@@ -81,23 +252,68 @@ class Z3Expression(object):
 			elif op == "&":
 				return self._and(z3_l, z3_r, solver)
 
-			# equality gets coerced to integer
+			# arrays
+			elif op == "select":
+				return self._select(z3_l, z3_r, env)
+			elif op == "store":
+				return self._store(z3_l, z3_r, args[2], env)
+
+			# strings
+			elif op == "str.len":
+				return self._strLen(z3_l, env)
+			elif op == "in":
+				return self._strContains(z3_l, z3_r, env)
+			elif op == "str.startswith":
+				return self._strStartswith(z3_l, z3_r, env)
+			elif op == "str.find":
+				return self._strFind(z3_l, z3_r, args[2], env)
+			elif op == "str.replace":
+				return self._strReplace(z3_l, z3_r, args[2], env)
+			elif op == "str.replace_all":
+				return self._strReplaceAll(z3_l, z3_r, args[2], env)
+			elif op == "str.count":
+				return self._strCount(z3_l, z3_r, env)
+			elif op == "str.strip":
+				return self._strStrip(z3_l, expr[2], solver, env)
+			elif op == "getitem":
+				return self._strGetitem(z3_l, z3_r, env)
+			elif op == "slice":
+				return self._strSlice(z3_l, z3_r, args[2], env)
+
+			# comparisons are Booleans; no model contains None
 			elif op == "==":
-				return self._wrapIf(z3_l == z3_r,solver,env)
+				if env == None and (z3_l is None or z3_r is None):
+					return BoolVal(z3_l is z3_r,solver.ctx)
+				return z3_l == z3_r
 			elif op == "!=":
-				return self._wrapIf(z3_l != z3_r,solver,env)
+				if env == None and (z3_l is None or z3_r is None):
+					return BoolVal(z3_l is not z3_r,solver.ctx)
+				return z3_l != z3_r
 			elif op == "<":
-				return self._wrapIf(z3_l < z3_r,solver,env)
+				return z3_l < z3_r
 			elif op == ">":
-				return self._wrapIf(z3_l > z3_r,solver,env)
+				return z3_l > z3_r
 			elif op == "<=":
-				return self._wrapIf(z3_l <= z3_r,solver,env)
+				return z3_l <= z3_r
 			elif op == ">=":
-				return self._wrapIf(z3_l >= z3_r,solver,env)
+				return z3_l >= z3_r
+
+			# connectives of SymbolicBool
+			elif op == "and":
+				return And(z3_l, z3_r) if env == None else z3_l and z3_r
+			elif op == "or":
+				return Or(z3_l, z3_r) if env == None else z3_l or z3_r
+			elif op == "not":
+				return Not(z3_l) if env == None else not z3_l
 			else:
 				utils.crash("Unknown BinOp during conversion from ast to Z3 (expressions): %s" % op)
 
 		elif isinstance(expr, SymbolicInteger):
+			if env == None and self.EAGER_TERMS and expr.term is not None:
+				# built while the program ran (see Z3EagerTerms)
+				for name in expr.term_vars:
+					self._getIntegerVariable(name,solver)
+				return expr.term
 			if expr.isVariable():
 				if env == None:
 					return self._getIntegerVariable(expr.name,solver)
@@ -106,18 +322,125 @@ class Z3Expression(object):
 			else:
 				return self._astToZ3Expr(expr.expr,solver,env)
 
+		elif isinstance(expr, SymbolicStr):
+			if expr.isVariable():
+				if env == None:
+					return self._getStringVariable(expr.name,solver)
+				else:
+					return env[expr.name]
+			else:
+				return self._astToZ3Expr(expr.expr,solver,env)
+
+		elif isinstance(expr, SymbolicArray):
+			if env == None:
+				return self._getArrayVariable(expr,solver)[0]
+			else:
+				return env[expr.name]
+
 		elif isinstance(expr, SymbolicType):
 			utils.crash("{} is an unsupported SymbolicType of {}".
 						format(expr, type(expr)))
 
+		elif isinstance(expr, ExprRef):
+			# an operand built eagerly (see Z3EagerTerms)
+			return expr
+
+		elif isinstance(expr, bool):
+			if env == None:
+				return BoolVal(expr,solver.ctx)
+			else:
+				return expr
+
 		elif isinstance(expr, int):
 			if env == None:
 				return self._constant(expr,solver)
 			else:
 				return expr
+
+		elif isinstance(expr, str):
+			if env == None:
+				return StringVal(expr,solver.ctx)
+			else:
+				return expr
+
+		elif expr is None:
+			return None
 		else:
 			utils.crash("Unknown node during conversion from ast to Z3 (expressions): %s" % expr)
 
+	def _select(self, a, i, env):
+		if env == None:
+			return Select(a, i)
+		return a[i] if 0 <= i < len(a) else 0
+
+	def _store(self, a, i, v, env):
+		if env == None:
+			return Store(a, i, v)
+		a = a + [0] * (i + 1 - len(a))
+		a[i] = v
+		return a
+
+	# Python semantics of the string operations; with env they are evaluated
+	# concretely, to check a model
+
+	def _strLen(self, s, env):
+		return len(s) if env != None else Length(s)
+
+	def _strContains(self, s, sub, env):
+		return sub in s if env != None else Contains(s, sub)
+
+	def _strStartswith(self, s, prefix, env):
+		return s.startswith(prefix) if env != None else PrefixOf(prefix, s)
+
+	def _strFind(self, s, sub, beg, env):
+		if env != None:
+			return s.find(sub, beg)
+		return IndexOf(s, sub, self._strClamp(s, beg))
+
+	def _strReplace(self, s, old, new, env):
+		# only the first occurrence, see SymbolicStr.replace
+		return s.replace(old, new, 1) if env != None else Replace(s, old, new)
+
+	def _strReplaceAll(self, s, old, new, env):
+		if env != None:
+			return s.replace(old, new)
+		return SeqRef(Z3_mk_seq_replace_all(s.ctx_ref(), s.as_ast(), old.as_ast(), new.as_ast()), s.ctx)
+
+	def _strCount(self, s, sub, env):
+		if env != None:
+			return s.count(sub)
+		return _countFunction(s.ctx)(s, sub)
+
+	def _strStrip(self, s, chars, solver, env):
+		# s == p + t + q, p and q made of chars, t neither starts nor ends with one
+		if env != None:
+			return s.strip(chars)
+		if chars == "":
+			return s
+		self.z3_aux += 1
+		p, t, q = [ String("__strip%d_%s" % (self.z3_aux, v), solver.ctx) for v in "ptq" ]
+		c = Union([ Re(StringVal(ch, solver.ctx)) for ch in chars ])
+		first, last = SubString(t, 0, 1), SubString(t, Length(t) - 1, 1)
+		solver.add(s == Concat(p, t, q), InRe(p, Star(c)), InRe(q, Star(c)),
+			Or(Length(t) == 0, And(Not(InRe(first, c)), Not(InRe(last, c)))))
+		return t
+
+	def _strGetitem(self, s, i, env):
+		if env != None:
+			return s[i]
+		return SubString(s, If(i < 0, i + Length(s), i), 1)
+
+	def _strSlice(self, s, start, stop, env):
+		if env != None:
+			return s[start:stop]
+		start, stop = self._strClamp(s, start), self._strClamp(s, stop)
+		return SubString(s, start, If(stop > start, stop - start, 0))
+
+	def _strClamp(self, s, i):
+		# a slice bound: negative bounds count from the end, then clipped to the string
+		n = Length(s)
+		return If(i < 0, If(i + n < 0, 0, i + n), If(i > n, n, i))
+
 	def _add(self, l, r, solver):
 		return l + r
 
@@ -147,3 +470,22 @@ class Z3Expression(object):
 
 	def _and(self, l, r, solver):
 		return l & r
+
+
+# recursive str.count of each context, defined on first use
+_count_functions = {}
+
+def _countFunction(ctx):
+	"""str.count as a recursive function: one occurrence, then the count in
+	   the rest of the string after it. Z3 unfolds it as deep as a model
+	   needs, so there is no bound on the number of occurrences."""
+	entry = _count_functions.get(id(ctx))
+	if entry is None:
+		f = RecFunction("str.count", StringSort(ctx), StringSort(ctx), IntSort(ctx))
+		s, sub = String("s", ctx), String("sub", ctx)
+		idx = IndexOf(s, sub, IntVal(0, ctx))
+		rest = SubString(s, idx + Length(sub), Length(s))
+		RecAddDefinition(f, [s, sub], If(Length(sub) == 0, Length(s) + 1,
+			If(idx < 0, 0, 1 + f(rest, sub))))
+		entry = _count_functions[id(ctx)] = (ctx, f)
+	return entry[1]
@@ -8,6 +8,9 @@ class Z3Integer(Z3Expression):
 	def _variable(self,name,solver):
 		return Int(name,solver.ctx)
 
+	def _arrayVariable(self,name,solver):
+		return Array(name,IntSort(solver.ctx),IntSort(solver.ctx))
+
 	def _constant(self,v,solver):
 		return IntVal(v,solver.ctx)
 
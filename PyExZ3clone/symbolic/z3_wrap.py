@@ -3,6 +3,7 @@
 import sys
 import ast
 import logging
+import time
 import z3
 
 
@@ -10,24 +11,56 @@ from z3 import Solver, And, BitVecVal, sat, unsat, unknown
 
 from symbolic.z3_expr.integer import Z3Integer
 from symbolic.z3_expr.bitvector import Z3BitVector
+from symbolic.components import queryComponent
 
 log = logging.getLogger("se.z3")
 
 class Z3Wrapper(object):
-	def __init__(self):
+	# per query limit (ms) for string queries, which may not terminate
+	STRING_TIMEOUT = 5000
+
+	def __init__(self, cache=True):
 		self.N = 32
 		self.asserts = None
 		self.query = None
 		self.use_lia = True
+		# without bit-vectors, the answer of the QF_LIA encoding is final
+		self.use_bv = True
 		self.z3_expr = None
+		self.unsat_core = None
+		# solutions per independent component of the query
+		self.cache = {} if cache else None
+		self.cache_hits = 0
+		# optional SMT-LIB2 dump of every check (see query_dump.py)
+		self.dump = None
+		self.constraint_id = None
+		self.path_length = 0
 
-	def findCounterexample(self, asserts, query):
+	def findCounterexample(self, asserts, query, constraint_id=None, path_length=None):
 		"""Tries to find a counterexample to the query while
-	  	 asserts remains valid."""
+	  	 asserts remains valid. The constraint id and the length of the
+	  	 path (if asserts are only a part of it) label dumped checks."""
 		self.solver = Solver()
+		self.unsat_core = None
+		self.constraint_id = constraint_id
+		self.path_length = len(asserts) if path_length is None else path_length
 		self.query = query
 		self.asserts = self._coneOfInfluence(asserts,query)
+		key = self._cacheKey()
+		if self.cache is not None and key in self.cache:
+			self.cache_hits += 1
+			res, core, _ = self.cache[key]
+			# None stands for the query the core was computed for
+			if core is not None:
+				self.unsat_core = [ query if p is None else p for p in core ]
+			log.debug("Cached component -- %s" % res)
+			return res
 		res = self._findModel()
+		core = None
+		if self.unsat_core is not None:
+			core = [ None if p is query else p for p in self.unsat_core ]
+		if self.cache is not None:
+			self.cache[key] = (res, core, (self.asserts, query.symtype))
 		log.debug("Query -- %s" % self.query)
 		log.debug("Asserts -- %s" % asserts)
 		log.debug("Cone -- %s" % self.asserts)
@@ -36,30 +69,39 @@ class Z3Wrapper(object):
 
 	# private
 
-	# this is very inefficient
 	def _coneOfInfluence(self,asserts,query):
-		cone = []
-		cone_vars = set(query.getVars())
-		ws = [ a for a in asserts if len(set(a.getVars()) & cone_vars) > 0 ]
-		remaining = [ a for a in asserts if a not in ws ]
-		while len(ws) > 0:
-			a = ws.pop()
-			a_vars = set(a.getVars())
-			cone_vars = cone_vars.union(a_vars)
-			cone.append(a)
-			new_ws = [ a for a in remaining if len(set(a.getVars()) & cone_vars) > 0 ]
-			remaining = [ a for a in remaining if a not in new_ws ]
-			ws = ws + new_ws
-		return cone
+		return queryComponent(asserts,query)
+
+	def _cacheKey(self):
+		# predicates of the tree are interned, so ids identify them; the
+		# entry keeps them alive (see findCounterexample)
+		return (frozenset(id(a) for a in self.asserts), id(self.query.symtype), self.query.result)
 
 	def _findModel(self):
 		# Try QF_LIA first (as it may fairly easily recognize unsat instances)
 		if self.use_lia:
 			self.solver.push()
 			self.z3_expr = Z3Integer()
-			self.z3_expr.toZ3(self.solver,self.asserts,self.query)
-			res = self.solver.check()
+			self.z3_expr.toZ3Tracked(self.solver,self.asserts,self.query)
+			if self.z3_expr.z3_strings:
+				self.solver.set("timeout",Z3Wrapper.STRING_TIMEOUT)
+			res = self._check("lia",self.z3_expr.trackers)
 			#print(self.solver.assertions)
+			if res == unsat:
+				# keep the explanation so the engine can prune similar queries
+				self.unsat_core = self.z3_expr.getUnsatCore(self.solver)
+			if self.z3_expr.z3_strings or not self.use_bv:
+				if res == unknown and self.z3_expr.z3_strings:
+					# the sequence solver gives up on some operations (e.g.
+					# replace_all) under tracking literals: retry untracked
+					self.solver.pop()
+					self.solver.push()
+					self.z3_expr.toZ3(self.solver,self.asserts,self.query)
+					res = self._check("lia")
+				# strings have no bit-vector encoding: this is the final answer
+				ret = self._getLiaModel(res)
+				self.solver.pop()
+				return ret
 			self.solver.pop()
 			if res == unsat:
 				return None
@@ -100,7 +142,7 @@ class Z3Wrapper(object):
 			self.solver.push()
 			constraints = self._boundIntegers(int_vars,self.bound)
 			self.solver.assert_exprs(constraints)
-			res = self.solver.check()
+			res = self._check("bv%d" % self.N)
 			if res == unsat:
 				self.bound = (self.bound << 1)+1
 				self.solver.pop()
@@ -110,29 +152,54 @@ class Z3Wrapper(object):
 			#print("Match?")
 			#print(self.solver.assertions)
 			self.solver.pop()
-			mismatch = False
-			for a in self.asserts:
-				eval = self.z3_expr.predToZ3(a,self.solver,model)
-				if (not eval):
-					mismatch = True
-					break
-			if (not mismatch):
-				mismatch = not (not self.z3_expr.predToZ3(self.query,self.solver,model))
+			mismatch = self._mismatch(model)
 			#print(mismatch)
 			return (res,mismatch)
 		elif res == unknown:
 			self.solver.pop()
 		return (res,False)
 
-	def _getModel(self):
+	def _check(self,encoding,trackers=()):
+		start = time.perf_counter()
+		res = self.solver.check()
+		if self.dump is not None:
+			self.dump.write(self.solver,trackers,{
+				"constraint": self.constraint_id,
+				"path_length": self.path_length,
+				"cone": len(self.asserts),
+				"encoding": encoding,
+				"result": res,
+				"time": "%.6f" % (time.perf_counter() - start)})
+		return res
+
+	def _getLiaModel(self,res):
+		if res != sat:
+			return None
+		model = self._getModel(True)
+		# the integer encoding of %, << etc. is uninterpreted: check the model
+		return None if self._mismatch(model) else model
+
+	def _mismatch(self,model):
+		"""Does the concrete evaluation of the asserts and query under
+		   model disagree with the solver?"""
+		try:
+			for a in self.asserts:
+				if not self.z3_expr.predToZ3(a,self.solver,model):
+					return True
+			return not (not self.z3_expr.predToZ3(self.query,self.solver,model))
+		except Exception:
+			return True
+
+	def _getModel(self,completion=False):
 		res = {}
 		model = self.solver.model()
 		for name in self.z3_expr.z3_vars.keys():
-			try:
-				ce = model.eval(self.z3_expr.z3_vars[name])
-				res[name] = ce.as_signed_long()
-			except:
-				pass
+			ce = model.eval(self.z3_expr.z3_vars[name],model_completion=completion)
+			value = self.z3_expr.getValue(ce)
+			if value is not None:
+				res[name] = value
+		res.update(self.z3_expr.getListModel(model,self.solver))
+		res.update(self.z3_expr.getDictModel(model,self.solver))
 		return res
 	
 	def _boundIntegers(self,vars,val):
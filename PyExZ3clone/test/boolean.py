@@ -0,0 +1,14 @@
+# Copyright: see copyright.txt
+
+def boolean(x, y):
+	both = (x > 0) & (y > 0)
+	if both ^ (x == y):
+		return 0
+	if ((x < 10) | (y == 3)) == False:
+		return 1
+	if (x > y) + (y < 0) == 2:
+		return 2
+	return 3
+
+def expected_result_set():
+	return [0,1,2,3]
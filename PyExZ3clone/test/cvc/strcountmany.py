@@ -0,0 +1,12 @@
+from symbolic.args import symbolic
+
+
+@symbolic(s="foo")
+def strcountmany(s):
+    if s.count("a") > 9:
+        return 1
+    return 0
+
+
+def expected_result_set():
+    return {0, 1}
@@ -0,0 +1,16 @@
+from symbolic.args import symbolic
+
+
+@symbolic(s="a&b", sep="&")
+def strsplitempty(s, sep):
+    try:
+        pieces = s.split(sep)
+    except ValueError:
+        return 0
+    if len(pieces) == 2:
+        return 1
+    return 2
+
+
+def expected_result_set():
+    return {0, 1, 2}
@@ -2,10 +2,13 @@ from symbolic.args import *
 
 @symbolic(d=dict([(42,6)]))
 def decorator_dict(d):
-	if d[42] == 6:
-		return 0
-	else:
-		return 1
+	try:
+		if d[42] == 6:
+			return 0
+		else:
+			return 1
+	except KeyError:
+		return 2
 
 def expected_result():
-	return [0]
\ No newline at end of file
+	return [0,1,2]
\ No newline at end of file
@@ -0,0 +1,15 @@
+from symbolic.args import *
+
+@symbolic(l=[1,2])
+def decorator_list(l,i):
+	if 0 <= i < len(l) and l[i] == 7:
+		if len(l) > 3:
+			return 0
+		return 1
+	l.append(i)
+	if l[len(l)-1] == 9:
+		return 2
+	return 3
+
+def expected_result_set():
+	return [0,1,2,3]
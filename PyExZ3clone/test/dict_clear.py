@@ -0,0 +1,10 @@
+from symbolic.args import *
+
+@symbolic(d=dict([(1,2)]))
+def dict_clear(d):
+	r = 1 if 5 in d else 0
+	d.clear()
+	return r + len(list(d))
+
+def expected_result_set():
+	return {0,1}
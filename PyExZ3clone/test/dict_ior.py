@@ -0,0 +1,9 @@
+from symbolic.args import *
+
+@symbolic(d=dict([(1,2)]))
+def dict_ior(d):
+	d |= {5: 6}
+	return len([ k for k in d if k == 5 ])
+
+def expected_result_set():
+	return {1}
@@ -0,0 +1,14 @@
+from symbolic.args import *
+
+@symbolic(d=dict([(1,2)]))
+def dict_popitem(d):
+	try:
+		k, v = d.popitem()
+	except KeyError:
+		return 0
+	if len(list(d)) == 0:
+		return 1
+	return 2
+
+def expected_result_set():
+	return {0,1,2}
@@ -0,0 +1,14 @@
+# Explored with expression limits: python run_tests.py --expr-depth-limit=3 test/limits
+# y = y + 1 simplifies to x + c, which stays within the limit however
+# many times the loop runs, so the branch after the loop is still symbolic
+
+def loop_counter(x):
+    y = x
+    for i in range(10):
+        y = y + 1
+    if y == 15:
+        return 1
+    return 0
+
+def expected_result():
+    return [0, 1]
@@ -0,0 +1,12 @@
+from symbolic.args import *
+
+@symbolic(l=[1,2])
+def list_imul(l):
+	n = len(l)
+	l *= 2
+	if len([ x for x in l ]) == 2 * n:
+		return 1
+	return 0
+
+def expected_result_set():
+	return {1}
@@ -0,0 +1,14 @@
+from symbolic.args import *
+
+@symbolic(l=[1,2])
+def list_slice_assign(l):
+	if not l:
+		return 0
+	n = len(l)
+	l[0:1] = [7,8,9]
+	if len([ x for x in l ]) == n + 2:
+		return 1
+	return 2
+
+def expected_result_set():
+	return {0,1}
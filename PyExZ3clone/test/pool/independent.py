@@ -0,0 +1,15 @@
+# Explored with the model pool: python run_tests.py --reuse-pool=16 test/pool
+# The query a > 0 and b > 0 is answered by an earlier input with b > 0: its
+# component is b > 0 alone, the current input already has a > 0
+
+def independent(a, b):
+    r = 0
+    if a > 0:
+        r += 1
+    if b > 0:
+        r += 2
+    return r
+
+
+def expected_result():
+    return [0, 1, 2, 3]
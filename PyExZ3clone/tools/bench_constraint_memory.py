@@ -0,0 +1,52 @@
+# Measure the memory held by the constraint tree, in bytes per node.
+#
+# Drives PathToConstraint.whichBranch the way an exploration does: every
+# execution walks down from the root, evaluating one freshly built symbolic
+# predicate per level and taking a random direction.
+#
+# To run (from the PyExZ3clone directory):
+# $ python tools/bench_constraint_memory.py [executions] [depth]
+
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from symbolic.path_to_constraint import PathToConstraint
+from symbolic.symbolic_types import SymbolicInteger
+
+
+def count_nodes(c):
+    return 1 + sum(count_nodes(child) for child in c.children)
+
+
+def build_tree(executions, depth, num_vars=8, seed=0):
+    rng = random.Random(seed)
+    frontier = []
+    path = PathToConstraint(frontier.append)
+    for _ in range(executions):
+        path.reset(None)
+        xs = [SymbolicInteger("x%d" % i, rng.randrange(100)) for i in range(num_vars)]
+        for level in range(depth):
+            pred = (xs[level % num_vars] + level) > 3 * level
+            path.whichBranch(rng.random() < 0.5, pred)
+    return path, frontier
+
+
+def main():
+    executions = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    depth = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    path, frontier = build_tree(executions, depth)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    nodes = count_nodes(path.root_constraint)
+    print("executions: %d, depth: %d, nodes: %d" % (executions, depth, nodes))
+    print("bytes per node: %.1f" % ((after - before) / nodes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# Measure the overhead of per-input coverage (symbolic/coverage_collector.py).
+#
+# First the entry function of every target of the test directory is called
+# concretely, on the default values of its arguments (those of @symbolic
+# and @concrete, 0 otherwise), RUNS times with nothing recording, then
+# between start() and stop() of a CoverageCollector using sys.monitoring
+# (Python 3.12+) and using sys.settrace. The table reports the time per
+# call. This part needs neither z3 nor the engine, so it can be run with
+# any interpreter.
+#
+# Then, if z3 is importable, every target is explored by pyexz3.py (up to
+# MAX_ITERS iterations) with and without --no-coverage, and the median wall
+# times are compared.
+#
+# To run (from the PyExZ3clone directory):
+# $ python tools/bench_coverage.py [runs]
+
+import importlib
+import importlib.util
+import inspect
+import io
+import os
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import redirect_stdout
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+TEST = os.path.join(ROOT, "test")
+MAX_ITERS = 25
+sys.path[:0] = [ROOT, TEST]
+
+from symbolic.coverage_collector import CoverageCollector
+
+
+def targets():
+    for name in sorted(os.listdir(TEST)):
+        if not name.endswith(".py"):
+            continue
+        entry = name[:-3]
+        try:
+            with redirect_stdout(io.StringIO()):
+                module = importlib.import_module(entry)
+        except BaseException:
+            continue
+        func = getattr(module, entry, None)
+        if not inspect.isfunction(func):
+            continue
+        args = {a: 0 for a in inspect.getfullargspec(func).args}
+        args.update(getattr(func, "symbolic_args", {}))
+        args.update(getattr(func, "concrete_args", {}))
+        try:
+            with redirect_stdout(io.StringIO()):
+                func(**args)
+        except BaseException:
+            continue
+        yield entry, module.__file__, func, args
+
+
+def per_call(func, args, runs, collector=None):
+    with redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for _ in range(runs):
+            if collector is not None:
+                collector.start()
+            try:
+                func(**args)
+            finally:
+                if collector is not None:
+                    collector.stop()
+        return (time.perf_counter() - start) / runs
+
+
+def explore(path, entry, coverage):
+    args = [sys.executable, "pyexz3.py", "--start=" + entry, "--max-iters=%d" % MAX_ITERS, path]
+    if not coverage:
+        args.append("--no-coverage")
+    start = time.perf_counter()
+    subprocess.run(args, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    monitoring = hasattr(sys, "monitoring")
+    found = list(targets())
+
+    print("Python %s, %d calls per target\n" % (sys.version.split()[0], runs))
+    print("%-24s%12s%14s%12s" % ("target", "bare us", "monitoring us", "settrace us"))
+    totals = [0.0, 0.0, 0.0]
+    for entry, path, func, args in found:
+        row = [per_call(func, args, runs)]
+        if monitoring:
+            collector = CoverageCollector([path])
+            row.append(per_call(func, args, runs, collector))
+            collector.close()
+        else:
+            row.append(float("nan"))
+        traced = CoverageCollector([path])
+        traced.use_monitoring = False
+        row.append(per_call(func, args, runs, traced))
+        totals = [t + r for t, r in zip(totals, row)]
+        print("%-24s%12.2f%14.2f%12.2f" % (entry, 1e6 * row[0], 1e6 * row[1], 1e6 * row[2]))
+    print("%-24s%12.2f%14.2f%12.2f" % ("total", 1e6 * totals[0], 1e6 * totals[1], 1e6 * totals[2]))
+
+    if importlib.util.find_spec("z3") is None:
+        print("\nz3 is not importable, skipping the explorations")
+        return
+    print("\n%-24s%14s%14s%10s" % ("target", "coverage ms", "none ms", "ratio"))
+    totals = [0.0, 0.0]
+    for entry, path, _, _ in found:
+        medians = [statistics.median(explore(path, entry, c) for _ in range(3)) for c in (True, False)]
+        totals = [t + m for t, m in zip(totals, medians)]
+        print("%-24s%14.1f%14.1f%10.2f" % (entry, 1000 * medians[0], 1000 * medians[1],
+                                           medians[0] / medians[1]))
+    print("%-24s%14.1f%14.1f%10.2f" % ("total", 1000 * totals[0], 1000 * totals[1],
+                                       totals[0] / totals[1]))
+
+
+if __name__ == "__main__":
+    main()
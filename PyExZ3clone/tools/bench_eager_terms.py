@@ -0,0 +1,103 @@
+# Compare translating expressions per query with building Z3 terms eagerly.
+#
+# Every target of the test directory is explored in its own process, once
+# per mode (ExplorationEngine's eager_terms). The table reports, per mode,
+# the number of generated inputs, the time spent converting predicates to
+# Z3 (Z3Expression.toZ3/toZ3Tracked) and the wall time of the exploration.
+# The entry point is the function named after the file, or main.
+#
+# To run (from the PyExZ3clone directory):
+# $ python tools/bench_eager_terms.py [test directory] [max iterations]
+
+import os
+import re
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+MODES = ["translate", "eager"]
+
+
+def entry_point(path):
+    name = os.path.basename(path)[:-3]
+    with open(path) as f:
+        source = f.read()
+    return name if re.search(r"^def %s\(" % re.escape(name), source, re.M) else "main"
+
+
+def measure(path, mode, max_iters):
+    # runs in the child process
+    sys.path.insert(0, ROOT)
+    from symbolic.loader import loaderFactory
+    from symbolic.explore import ExplorationEngine
+    from symbolic.z3_expr.expression import Z3Expression
+
+    stats = {"translate": 0.0}
+
+    def timed(convert):
+        def wrapper(self, *args):
+            start = time.perf_counter()
+            try:
+                return convert(self, *args)
+            finally:
+                stats["translate"] += time.perf_counter() - start
+        return wrapper
+
+    Z3Expression.toZ3 = timed(Z3Expression.toZ3)
+    Z3Expression.toZ3Tracked = timed(Z3Expression.toZ3Tracked)
+    app = loaderFactory(os.path.abspath(path), entry_point(path))
+    if app is None:
+        return
+    inputs = []
+    start = time.perf_counter()
+    try:
+        engine = ExplorationEngine(app.createInvocation(), solver="z3", eager_terms=mode == "eager")
+        inputs = engine.explore(max_iters)[0]
+    except AssertionError:
+        # the target failed an assertion: report the exploration so far
+        pass
+    elapsed = time.perf_counter() - start
+    print("EAGER_STATS %d %f %f" % (len(inputs), stats["translate"], elapsed))
+
+
+def explore(path, mode, max_iters, timeout=300):
+    cmd = [sys.executable, os.path.abspath(__file__), "--measure", path, mode, str(max_iters)]
+    try:
+        proc = subprocess.run(cmd, cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                              universal_newlines=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return None
+    m = re.search(r"^EAGER_STATS (\d+) (\S+) (\S+)$", proc.stdout, re.M)
+    if m is None:
+        return None
+    return int(m.group(1)), float(m.group(2)), float(m.group(3))
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--measure":
+        measure(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+        return
+    test_dir = os.path.abspath(sys.argv[1] if len(sys.argv) > 1 else os.path.join(ROOT, "test_bench"))
+    max_iters = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+    files = sorted(f for f in os.listdir(test_dir) if f.endswith(".py"))
+
+    print("%-20s" % "target" + "".join("%-34s" % m for m in MODES))
+    totals = {m: [0.0, 0.0] for m in MODES}
+    for f in files:
+        row = "%-20s" % f[:-3]
+        for m in MODES:
+            res = explore(os.path.join(test_dir, f), m, max_iters)
+            if res is None:
+                row += "%-34s" % "error"
+                continue
+            totals[m][0] += res[1]
+            totals[m][1] += res[2]
+            row += "%-34s" % ("%3d inputs %7.3fs / %7.3fs" % res)
+        print(row)
+    print("%-20s" % "total" + "".join(
+        "%-34s" % ("           %7.3fs / %7.3fs" % tuple(totals[m])) for m in MODES))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# Measure what the former global "builtins.len = lambda x: x.__len__()"
+# cost against the len binding the loader now gives the target's modules
+# only (see symbolicLen in symbolic/loader.py).
+#
+# First a microbenchmark of one len() call, then every target of TARGETS
+# is explored RUNS times in a fresh interpreter in both setups; the global
+# patch is put back by a wrapper before pyexz3.py runs. The table reports
+# the median wall time of each and checks that both find the same inputs.
+#
+# To run (from the PyExZ3clone directory):
+# $ python tools/bench_len_patch.py [runs]
+
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+TARGETS = ["test/len_test.py", "test/binary_search.py", "test/list.py", "test/dictionary.py",
+           "test/many_branches.py", "test/eight_queen.py", "test/cvc/strsplit.py",
+           "test/cvc/strcount.py", "test/cvc/strfind.py"]
+
+GLOBAL_PATCH = ("import builtins, runpy, sys\n"
+                "builtins.len = (lambda x: x.__len__())\n"
+                "sys.argv = sys.argv[1:]\n"
+                "runpy.run_path(sys.argv[0], run_name='__main__')\n")
+
+
+def explore(target, patched):
+    entry = os.path.basename(target)[:-3]
+    args = ["pyexz3.py", "--start=" + entry, target]
+    if patched:
+        args = ["-c", GLOBAL_PATCH] + args
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable] + args, cwd=ROOT, stdout=subprocess.PIPE,
+                          stderr=subprocess.DEVNULL, text=True)
+    elapsed = time.perf_counter() - start
+    inputs = len(re.findall(r"^Test Case \d+:", proc.stdout, re.M))
+    return elapsed, inputs, proc.returncode
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+
+    s = "abc"
+    patched_len = (lambda x: x.__len__())
+    n = 1000000
+    builtin = min(timeit.repeat(lambda: len(s), number=n, repeat=5)) / n
+    patched = min(timeit.repeat(lambda: patched_len(s), number=n, repeat=5)) / n
+    print("len('abc'): builtin %.1f ns, global patch %.1f ns (%.2fx)\n"
+          % (builtin * 1e9, patched * 1e9, patched / builtin))
+
+    print("%-16s%14s%14s%10s%8s" % ("target", "global ms", "targeted ms", "ratio", "same"))
+    totals = [0.0, 0.0]
+    for target in TARGETS:
+        if not os.path.exists(os.path.join(ROOT, target)):
+            continue
+        medians = []
+        outcomes = []
+        for patched in (True, False):
+            results = [explore(target, patched) for _ in range(runs)]
+            medians.append(statistics.median(r[0] for r in results))
+            outcomes.append(results[0][1:])
+        totals[0] += medians[0]
+        totals[1] += medians[1]
+        name = os.path.basename(target)[:-3]
+        print("%-16s%14.1f%14.1f%10.2f%8s" % (name, 1000 * medians[0], 1000 * medians[1],
+                                              medians[0] / medians[1],
+                                              "yes" if outcomes[0] == outcomes[1] else "NO"))
+    print("%-16s%14.1f%14.1f%10.2f" % ("total", 1000 * totals[0], 1000 * totals[1],
+                                       totals[0] / totals[1]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# Measure the size of the Z3 queries and the time spent solving them.
+#
+# Every target of the test directory is explored in its own process; each
+# solver check reports the number of distinct AST nodes of its assertions
+# and its duration. The table reports, per target, the number of checks,
+# the mean query size and the total solve time.
+#
+# To run (from the PyExZ3clone directory):
+# $ python tools/bench_query_size.py [test directory] [max iterations]
+
+import os
+import re
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def dag_size(assertions):
+    seen = set()
+    todo = list(assertions)
+    while todo:
+        e = todo.pop()
+        if e.get_id() in seen:
+            continue
+        seen.add(e.get_id())
+        todo.extend(e.children())
+    return len(seen)
+
+
+def measure(path, max_iters):
+    # runs in the child process
+    sys.path.insert(0, ROOT)
+    import z3
+    from symbolic.loader import loaderFactory
+    from symbolic.explore import ExplorationEngine
+
+    stats = {"checks": 0, "nodes": 0, "time": 0.0}
+    check = z3.Solver.check
+
+    def timed_check(self, *assumptions):
+        stats["checks"] += 1
+        stats["nodes"] += dag_size(list(self.assertions()) + list(assumptions))
+        start = time.perf_counter()
+        try:
+            return check(self, *assumptions)
+        finally:
+            stats["time"] += time.perf_counter() - start
+
+    z3.Solver.check = timed_check
+    name = os.path.basename(path)[:-3]
+    app = loaderFactory(os.path.abspath(path), name)
+    if app is None:
+        return
+    try:
+        ExplorationEngine(app.createInvocation(), solver="z3").explore(max_iters)
+    except AssertionError:
+        # the target failed an assertion: report the queries solved so far
+        pass
+    print("QUERY_STATS %d %d %f" % (stats["checks"], stats["nodes"], stats["time"]))
+
+
+def explore(path, max_iters, timeout=120):
+    cmd = [sys.executable, os.path.abspath(__file__), "--measure", path, str(max_iters)]
+    try:
+        proc = subprocess.run(cmd, cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                              universal_newlines=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return None
+    m = re.search(r"^QUERY_STATS (\d+) (\d+) (\S+)$", proc.stdout, re.M)
+    if m is None:
+        return None
+    return int(m.group(1)), int(m.group(2)), float(m.group(3))
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--measure":
+        measure(sys.argv[2], int(sys.argv[3]))
+        return
+    test_dir = os.path.abspath(sys.argv[1] if len(sys.argv) > 1 else os.path.join(ROOT, "test"))
+    max_iters = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+    files = sorted(f for f in os.listdir(test_dir) if f.endswith(".py"))
+
+    print("%-24s%8s%12s%12s" % ("target", "checks", "mean nodes", "solve (s)"))
+    checks = nodes = 0
+    solve = 0.0
+    for f in files:
+        res = explore(os.path.join(test_dir, f), max_iters)
+        if res is None:
+            print("%-24s%8s" % (f[:-3], "error"))
+            continue
+        checks += res[0]
+        nodes += res[1]
+        solve += res[2]
+        print("%-24s%8d%12.1f%12.3f" % (f[:-3], res[0], res[1] / max(res[0], 1), res[2]))
+    print("%-24s%8d%12.1f%12.3f" % ("total", checks, nodes / max(checks, 1), solve))
+
+
+if __name__ == "__main__":
+    main()
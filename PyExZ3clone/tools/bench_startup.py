@@ -0,0 +1,76 @@
+# Measure the startup time of the command line and check what it imports.
+#
+# Each command is run RUNS times in a fresh interpreter; the table reports
+# the median and minimum wall time, next to a bare "python -c pass". Then
+# "python -X importtime pyexz3.py --help" is inspected: the exit status is
+# 1 if argument parsing pulls in any of the modules of HEAVY, which must
+# only be imported once an exploration starts.
+#
+# To run (from the PyExZ3clone directory):
+# $ python tools/bench_startup.py [runs]
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+HEAVY = ["z3", "rich", "multiprocessing", "symbolic.explore", "symbolic.z3_wrap"]
+
+COMMANDS = [
+    ("python -c pass", ["-c", "pass"]),
+    ("pyexz3.py --help", ["pyexz3.py", "--help"]),
+    ("pyexz3.py (no target)", ["pyexz3.py"]),
+    ("import symbolic.explore", ["-c", "import symbolic.explore"]),
+    ("import symbolic.z3_wrap", ["-c", "import symbolic.z3_wrap"]),
+]
+
+
+def wall_times(args, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=ROOT, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def imported_modules(args):
+    """Modules imported by the command, with their cumulative microseconds."""
+    proc = subprocess.run([sys.executable, "-X", "importtime"] + args, cwd=ROOT,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        try:
+            modules[name.strip()] = int(cumulative)
+        except ValueError:
+            # the header line
+            pass
+    return modules
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    print("%-28s%12s%12s" % ("command", "median ms", "min ms"))
+    for label, args in COMMANDS:
+        times = wall_times(args, runs)
+        print("%-28s%12.1f%12.1f" % (label, 1000 * statistics.median(times), 1000 * min(times)))
+
+    modules = imported_modules(["pyexz3.py", "--help"])
+    heavy = sorted(m for m in modules if any(m == h or m.startswith(h + ".") for h in HEAVY))
+    slowest = sorted(modules.items(), key=lambda m: -m[1])[:5]
+    print("\nslowest imports of pyexz3.py --help: " +
+          ", ".join("%s %.1f ms" % (m, us / 1000) for m, us in slowest))
+    if heavy:
+        print("REGRESSION: pyexz3.py --help imports " + ", ".join(heavy))
+        sys.exit(1)
+    print("pyexz3.py --help imports none of " + ", ".join(HEAVY))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# Compare the Z3 and CVC backends on the string targets of test/cvc.
+#
+# Every target is explored once per backend in its own process; the table
+# reports whether the expected results were met, the number of generated
+# inputs and the wall time. A backend whose bindings are not installed is
+# reported as unavailable.
+#
+# To run (from the PyExZ3clone directory):
+# $ python tools/bench_string_backends.py [test directory] [max iterations]
+
+import importlib.util
+import os
+import re
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def available(solver):
+    module = "CVC4" if solver == "cvc" else "z3"
+    return importlib.util.find_spec(module) is not None
+
+
+def explore(path, solver, max_iters, timeout=300):
+    name = os.path.basename(path)[:-3]
+    cmd = [sys.executable, "pyexz3.py", "--start=" + name, "--max-iters=%d" % max_iters,
+           "--" + solver, "--no-coverage", path]
+    start = time.time()
+    try:
+        proc = subprocess.run(cmd, cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                              universal_newlines=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return "timeout", 0, time.time() - start
+    elapsed = time.time() - start
+    inputs = len(re.findall(r"^Test Case \d+:", proc.stdout, re.M))
+    return ("pass" if proc.returncode == 0 else "fail"), inputs, elapsed
+
+
+def main():
+    test_dir = os.path.abspath(sys.argv[1] if len(sys.argv) > 1 else os.path.join(ROOT, "test", "cvc"))
+    max_iters = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+    solvers = ["z3", "cvc"]
+    files = sorted(f for f in os.listdir(test_dir) if f.endswith(".py"))
+
+    print("%-16s" % "target" + "".join("%-26s" % s for s in solvers))
+    totals = {s: [0, 0.0] for s in solvers}
+    for f in files:
+        row = "%-16s" % f[:-3]
+        for s in solvers:
+            if not available(s):
+                row += "%-26s" % "unavailable"
+                continue
+            status, inputs, elapsed = explore(os.path.join(test_dir, f), s, max_iters)
+            totals[s][0] += status == "pass"
+            totals[s][1] += elapsed
+            row += "%-26s" % ("%s %3d inputs %6.2fs" % (status, inputs, elapsed))
+        print(row)
+    print("%-16s" % "total" + "".join(
+        "%-26s" % ("%d/%d passed %6.2fs" % (totals[s][0], len(files), totals[s][1])
+                   if available(s) else "unavailable") for s in solvers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# Replay a corpus of SMT-LIB2 queries (pyexz3.py --dump-queries) under
+# different Z3 settings and report the distribution of solving times.
+#
+# A setting is a comma separated list of Z3 solver parameters, plus
+# optionally tactic=<name> to solve with that tactic, e.g.
+#   "timeout=2000,smt.arith.solver=2" or "tactic=qflia"
+# and "default" stands for Z3's defaults. Every (file, setting) pair is
+# solved in a pool of worker processes. The table reports, per setting
+# and encoding of the dumped check, the number of checks, how many
+# disagree with the recorded result (a timeout counts as unknown) and
+# the min / median / 90th percentile / max / total solving time.
+#
+# To run (from the PyExZ3clone directory):
+# $ python tools/replay_queries.py <corpus directory> [setting ...] [--jobs=N]
+
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from symbolic.query_dump import readQuery
+
+
+def parse_setting(setting):
+    """(tactic, parameters) of a setting."""
+    tactic, params = None, {}
+    if setting == "default":
+        return tactic, params
+    for item in setting.split(","):
+        key, _, value = item.partition("=")
+        if key == "tactic":
+            tactic = value
+        elif value in ("true", "false"):
+            params[key] = value == "true"
+        else:
+            try:
+                params[key] = int(value)
+            except ValueError:
+                params[key] = value
+    return tactic, params
+
+
+def solve(task):
+    path, setting = task
+    import z3
+    meta, text = readQuery(path)
+    tactic, params = parse_setting(setting)
+    solver = z3.Tactic(tactic).solver() if tactic else z3.Solver()
+    if params:
+        solver.set(**params)
+    solver.from_string(text)
+    start = time.perf_counter()
+    res = solver.check()
+    return setting, meta.get("encoding", "?"), str(res), meta.get("result"), time.perf_counter() - start
+
+
+def percentile(values, p):
+    return values[min(len(values) - 1, int(p * len(values)))]
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--jobs=")]
+    jobs = [int(a[7:]) for a in sys.argv[1:] if a.startswith("--jobs=")]
+    if not args:
+        print("usage: replay_queries.py <corpus directory> [setting ...] [--jobs=N]")
+        sys.exit(1)
+    corpus = args[0]
+    settings = args[1:] or ["default", "tactic=smt"]
+    files = sorted(os.path.join(corpus, f) for f in os.listdir(corpus) if f.endswith(".smt2"))
+    tasks = [(f, s) for s in settings for f in files]
+
+    with multiprocessing.Pool(jobs[0] if jobs else None) as pool:
+        results = pool.map(solve, tasks, chunksize=8)
+
+    groups = {}
+    for setting, encoding, res, recorded, seconds in results:
+        g = groups.setdefault((setting, encoding), [[], 0])
+        g[0].append(seconds)
+        g[1] += res != recorded
+    print("%-32s%-10s%8s%8s%10s%10s%10s%10s%10s" %
+          ("setting", "encoding", "checks", "differ", "min", "median", "p90", "max", "total"))
+    for (setting, encoding), (times, differ) in sorted(groups.items()):
+        times.sort()
+        print("%-32s%-10s%8d%8d%10.4f%10.4f%10.4f%10.4f%10.3f" %
+              (setting, encoding, len(times), differ, times[0], percentile(times, 0.5),
+               percentile(times, 0.9), times[-1], sum(times)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
 import ast
+import hashlib
 import inspect
+import json
+import os
 
 def extract_conditions_from_function(func):
     """
-    Extracts all conditional expressions (from if, elif, and while) 
+    Extracts all conditional expressions (from if, elif, and while)
     in a given function, including nested ones.
     Returns a list of strings representing those conditions.
     """
@@ -28,3 +31,309 @@ def extract_conditions_from_function(func):
     extractor = ConditionExtractor()
     extractor.visit(tree)
     return extractor.conditions
+
+
+MODULE_SCOPE = "<module>"
+
+# in-memory inventory cache, keyed by source hash and file name
+_inventory_cache = {}
+
+
+def source_hash(source):
+    """Returns the hex digest used to key cached inventories."""
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+class BranchSite:
+    """
+    One static branch point of the module: the test of an if/elif/while/assert,
+    a conditional expression, a short-circuiting and/or operand or a
+    comprehension filter. Line spans are inclusive; empty arms are omitted.
+    """
+
+    def __init__(self, kind, lineno, col_offset, function, text, outcomes,
+                 arms, stmt_end, loop):
+        self.kind = kind
+        self.lineno = lineno
+        self.col_offset = col_offset
+        self.function = function
+        self.text = text
+        self.outcomes = outcomes  # feasible outcomes, e.g. [True, False]
+        self.arms = arms          # {outcome: (first_line, last_line)}
+        self.stmt_end = stmt_end  # last line of the enclosing statement
+        self.loop = loop          # span of the innermost enclosing loop
+
+    def to_dict(self):
+        return {"kind": self.kind, "lineno": self.lineno, "col_offset": self.col_offset,
+                "function": self.function, "text": self.text, "outcomes": self.outcomes,
+                "arms": [[o, span] for o, span in self.arms.items()],
+                "stmt_end": self.stmt_end, "loop": self.loop}
+
+    @classmethod
+    def from_dict(cls, d):
+        arms = {o: tuple(span) for o, span in d["arms"]}
+        loop = tuple(d["loop"]) if d["loop"] is not None else None
+        return cls(d["kind"], d["lineno"], d["col_offset"], d["function"], d["text"],
+                   d["outcomes"], arms, d["stmt_end"], loop)
+
+    def __repr__(self):
+        return "%s@%d %s (%s)" % (self.kind, self.lineno, self.text, self.function)
+
+
+class BranchInventory:
+    """
+    Static branch inventory of a whole module. Branches are tracked per line:
+    CPython attributes the conditional jump of every operand to the position
+    of the enclosing statement, so a line is the finest granularity the
+    engine can observe at run time. Reachability is a cheap over-approximation
+    (taken arm, rest of the function, enclosing loop, callees and callers).
+    """
+
+    def __init__(self, digest, filename, sites, functions):
+        self.source_hash = digest
+        self.filename = filename
+        self.sites = sites
+        # qualname -> {"lineno", "end_lineno", "calls": [[lineno, name], ...]}
+        self.functions = functions
+        self.lines = {}
+        for s in sites:
+            self.lines.setdefault(s.lineno, []).append(s)
+        self._reach_cache = {}
+
+    def to_dict(self):
+        return {"source_hash": self.source_hash, "filename": self.filename,
+                "sites": [s.to_dict() for s in self.sites], "functions": self.functions}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d["source_hash"], d["filename"],
+                   [BranchSite.from_dict(s) for s in d["sites"]], d["functions"])
+
+    def outcomes_at(self, lineno):
+        """Feasible (line, outcome) pairs of the branch sites on a line."""
+        return {(lineno, o) for s in self.lines.get(lineno, []) for o in s.outcomes}
+
+    def reachable_functions(self, entry):
+        """Functions transitively callable from entry (by name)."""
+        if entry is None:
+            return set(self.functions)
+        seen = set()
+        work = [q for q in self.functions if q == entry or q.endswith("." + entry)]
+        while work:
+            q = work.pop()
+            if q in seen:
+                continue
+            seen.add(q)
+            for _, name in self.functions[q]["calls"]:
+                work.extend(self._resolve(name))
+            # nested functions are reachable from their parent
+            work.extend(n for n in self.functions if n.startswith(q + "."))
+        return seen
+
+    def reachable_outcomes(self, entry=None):
+        """All feasible (line, outcome) pairs in code reachable from entry.
+        Module-level branches only count when the whole script is the entry."""
+        funcs = self.reachable_functions(entry)
+        if entry is None:
+            funcs.add(MODULE_SCOPE)
+        return {(s.lineno, o) for s in self.sites if s.function in funcs for o in s.outcomes}
+
+    def reach(self, lineno, outcome):
+        """Lines holding branch sites that may still execute once the branch
+        at lineno has taken the given outcome."""
+        key = (lineno, outcome)
+        if key not in self._reach_cache:
+            self._reach_cache[key] = self._computeReach(lineno, outcome)
+        return self._reach_cache[key]
+
+    # -- private
+
+    def _resolve(self, name):
+        return [q for q in self.functions if q.rsplit(".", 1)[-1] == name]
+
+    def _computeReach(self, lineno, outcome):
+        lines = set()
+        for s in self.lines.get(lineno, []):
+            fn = self.functions.get(s.function)
+            fn_end = fn["end_lineno"] if fn else max(x.stmt_end for x in self.sites)
+            spans = [(s.stmt_end + 1, fn_end)]
+            if outcome in s.arms:
+                spans.append(s.arms[outcome])
+            if s.loop is not None:
+                spans.append(s.loop)
+            within = lambda l: any(first <= l <= last for first, last in spans)
+            lines |= {x.lineno for x in self.sites if x.function == s.function and within(x.lineno)}
+            if fn is not None:
+                lines |= self._calleeLines([name for l, name in fn["calls"] if within(l)])
+            lines |= self._callerLines(s.function)
+        return lines
+
+    def _calleeLines(self, names):
+        """Sites in the functions called by name, transitively."""
+        funcs = set()
+        work = list(names)
+        while work:
+            for q in self._resolve(work.pop()):
+                if q not in funcs:
+                    funcs.add(q)
+                    work.extend(name for _, name in self.functions[q]["calls"])
+        return {s.lineno for s in self.sites if s.function in funcs}
+
+    def _callerLines(self, function):
+        """Returning from function may reach anything in its (transitive) callers."""
+        callers = set()
+        names = [function.rsplit(".", 1)[-1]]
+        while names:
+            name = names.pop()
+            for q, fn in self.functions.items():
+                if q not in callers and any(n == name for _, n in fn["calls"]):
+                    callers.add(q)
+                    names.append(q.rsplit(".", 1)[-1])
+        return {s.lineno for s in self.sites if s.function in callers}
+
+
+class _InventoryBuilder(ast.NodeVisitor):
+    def __init__(self):
+        self.sites = []
+        self.functions = {}
+        self.scope = []
+        self.loops = []
+        self.stmts = []
+
+    def _function(self):
+        return ".".join(self.scope) if self.scope else MODULE_SCOPE
+
+    def _add(self, kind, test, arms):
+        if isinstance(test, ast.Constant):
+            outcomes = [bool(test.value)]
+        else:
+            outcomes = [True, False]
+        stmt_end = self.stmts[-1].end_lineno if self.stmts else test.end_lineno
+        loop = self.loops[-1] if self.loops else None
+        self.sites.append(BranchSite(kind, test.lineno, test.col_offset, self._function(),
+                                     ast.unparse(test), outcomes, arms, stmt_end, loop))
+
+    @staticmethod
+    def _span(nodes):
+        if not nodes:
+            return None
+        return (nodes[0].lineno, nodes[-1].end_lineno)
+
+    def _arms(self, body, orelse):
+        arms = {}
+        if self._span(body) is not None:
+            arms[True] = self._span(body)
+        if self._span(orelse) is not None:
+            arms[False] = self._span(orelse)
+        return arms
+
+    def visit(self, node):
+        if isinstance(node, ast.stmt):
+            self.stmts.append(node)
+            try:
+                return super().visit(node)
+            finally:
+                self.stmts.pop()
+        return super().visit(node)
+
+    def _visitScope(self, node):
+        self.scope.append(node.name)
+        self.functions[self._function()] = {"lineno": node.lineno,
+                                            "end_lineno": node.end_lineno, "calls": []}
+        outer_loops, self.loops = self.loops, []
+        self.generic_visit(node)
+        self.loops = outer_loops
+        self.scope.pop()
+
+    visit_FunctionDef = _visitScope
+    visit_AsyncFunctionDef = _visitScope
+    visit_ClassDef = _visitScope
+
+    def visit_Call(self, node):
+        fn = self.functions.get(self._function())
+        if fn is not None:
+            if isinstance(node.func, ast.Name):
+                fn["calls"].append([node.lineno, node.func.id])
+            elif isinstance(node.func, ast.Attribute):
+                fn["calls"].append([node.lineno, node.func.attr])
+        self.generic_visit(node)
+
+    def visit_If(self, node):
+        self._add("if", node.test, self._arms(node.body, node.orelse))
+        self.generic_visit(node)
+
+    def _visitLoop(self, node):
+        self.loops.append((node.lineno, node.end_lineno))
+        if isinstance(node, ast.While):
+            self._add("while", node.test, self._arms(node.body, node.orelse))
+        self.generic_visit(node)
+        self.loops.pop()
+
+    visit_While = _visitLoop
+    visit_For = _visitLoop
+    visit_AsyncFor = _visitLoop
+
+    def visit_Assert(self, node):
+        self._add("assert", node.test, {})
+        self.generic_visit(node)
+
+    def visit_IfExp(self, node):
+        self._add("ifexp", node.test, {True: (node.body.lineno, node.body.end_lineno),
+                                       False: (node.orelse.lineno, node.orelse.end_lineno)})
+        self.generic_visit(node)
+
+    def visit_BoolOp(self, node):
+        # every operand but the last one may short-circuit
+        for operand in node.values[:-1]:
+            self._add("boolop", operand, {})
+        self.generic_visit(node)
+
+    def _visitComprehension(self, node):
+        self.loops.append((node.lineno, node.end_lineno))
+        for gen in node.generators:
+            for cond in gen.ifs:
+                self._add("comprehension", cond, {})
+        self.generic_visit(node)
+        self.loops.pop()
+
+    visit_ListComp = _visitComprehension
+    visit_SetComp = _visitComprehension
+    visit_DictComp = _visitComprehension
+    visit_GeneratorExp = _visitComprehension
+
+
+def build_branch_inventory(source, filename="<unknown>", cache_dir=None):
+    """
+    Builds (or fetches from cache) the static branch inventory of a module's
+    source. Inventories are cached in memory by source hash and file name
+    (the inventory carries its file name) and, if cache_dir is given, as
+    JSON files named after the source hash.
+    """
+    digest = source_hash(source)
+    key = (digest, filename)
+    if key in _inventory_cache:
+        return _inventory_cache[key]
+
+    cache_file = os.path.join(cache_dir, digest + ".json") if cache_dir else None
+    if cache_file is not None and os.path.exists(cache_file):
+        with open(cache_file) as f:
+            inventory = BranchInventory.from_dict(json.load(f))
+        inventory.filename = filename
+    else:
+        builder = _InventoryBuilder()
+        builder.visit(ast.parse(source, filename))
+        inventory = BranchInventory(digest, filename, builder.sites, builder.functions)
+        if cache_file is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(cache_file, "w") as f:
+                json.dump(inventory.to_dict(), f)
+
+    _inventory_cache[key] = inventory
+    return inventory
+
+
+def branch_inventory_for_file(filename, cache_dir=None):
+    """Branch inventory of the module stored in filename."""
+    with open(filename) as f:
+        source = f.read()
+    return build_branch_inventory(source, os.path.abspath(filename), cache_dir)
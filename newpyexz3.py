@@ -3,10 +3,7 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath("./pyexz3clone"))
 
-import logging
 from optparse import OptionParser
-from symbolic.loader import loaderFactory
-from symbolic.explore import ExplorationEngine
 
 print("PyExZ3 (Python Exploration with Z3)")
 
@@ -22,7 +19,26 @@ parser.add_option("-g", "--graph", dest="dot_graph", action="store_true", help="
 parser.add_option("-m", "--max-iters", dest="max_iters", type="int", help="Run specified number of iterations", default=5)
 parser.add_option("--cvc", dest="solver", action="store_const", const="cvc", help="Use the CVC SMT solver")
 parser.add_option("--z3", dest="solver", action="store_const", const="z3", help="Use the Z3 SMT solver", default="z3")
+parser.add_option("--portfolio", dest="solver", action="store_const", const="portfolio", help="Race Z3 over integers, Z3 over bit-vectors and CVC in worker processes for every query")
+parser.add_option("--portfolio-jobs", dest="portfolio_jobs", type="int", help="Encodings raced at once by --portfolio, the most successful first (0: all)", default=0)
+parser.add_option("--dump-queries", dest="dump_queries", action="store", help="Write every Z3 check as an SMT-LIB2 file with metadata to this folder", default=None)
+parser.add_option("--reuse-pool", dest="reuse_pool", type="int", help="Try the last N input vectors on a query before calling the solver (0: off)", default=0)
+parser.add_option("--seeds", dest="seeds", action="store", help="Run the input vectors of this JSON or CSV corpus before solving any branch", default=None)
+parser.add_option("--reduce-suite", dest="reduce_suite", action="store_true", help="List only a subset of the generated inputs with the same line and branch coverage", default=False)
+parser.add_option("--results-cache", dest="results_cache", action="store", help="Folder keeping inputs and closed path conditions per entry point, replayed on the next run", default=None)
+parser.add_option("--sandbox", dest="sandbox", action="store_true", help="Run every execution in a reused worker process under the --sandbox-* limits", default=False)
+parser.add_option("--sandbox-timeout", dest="sandbox_timeout", type="float", help="Wall-clock seconds an execution may take in the sandbox (0: no limit)", default=10.0)
+parser.add_option("--sandbox-cpu", dest="sandbox_cpu", type="int", help="CPU seconds an execution may take in the sandbox (0: no limit)", default=0)
+parser.add_option("--sandbox-memory", dest="sandbox_memory", type="int", help="Address space of the sandbox worker in MB (0: no limit)", default=0)
 parser.add_option("-f", "--folder", dest="logfolder", action="store", help="Specify folder to save log files", default="logs")
+parser.add_option("--coverage-guided", dest="coverage_guided", action="store_true", help="Order the search by a static branch inventory and stop once all reachable branches are covered", default=False)
+parser.add_option("--no-coverage", dest="coverage", action="store_false", help="Do not record per-input line and branch coverage", default=True)
+parser.add_option("--inventory-cache", dest="inventory_cache", action="store", help="Folder caching static branch inventories by source hash", default=None)
+parser.add_option("--expr-depth-limit", dest="max_expr_depth", type="int", help="Concretize symbolic expressions deeper than this (0: no limit)", default=0)
+parser.add_option("--expr-size-limit", dest="max_expr_size", type="int", help="Concretize symbolic expressions with more nodes than this (0: no limit)", default=0)
+parser.add_option("--concretize-nonlinear", dest="concretize_nonlinear", action="store_true", help="Concretize the right operand of *, // and % between two symbolic values", default=False)
+parser.add_option("--concretization", dest="concretization", type="choice", choices=["assume", "free"], help="Record concretized values as path assumptions (assume) or drop them (free)", default="assume")
+parser.add_option("--eager-terms", dest="eager_terms", action="store_true", help="Build Z3 terms of integer operations as the program runs instead of translating expressions per query", default=False)
 
 (options, args) = parser.parse_args()
 
@@ -33,6 +49,22 @@ if len(args) == 0 or not args[0].endswith(".py") or not os.path.exists(args[0]):
 
 filename = os.path.abspath(args[0])
 
+# the engine (and with it z3) is only loaded once the arguments are valid
+import logging
+from symbolic.loader import loaderFactory
+from symbolic.explore import ExplorationEngine
+from symbolic.symbolic_types.limits import ExpressionLimits
+from symbolic.coverage_collector import CoverageCollector
+from symbolic.seeds import loadSeeds
+from symbolic.results_store import ResultsStore, functionHash
+
+# Build the static branch inventory before the target's directory shadows lib/
+inventory = None
+if options.coverage_guided:
+    from lib.conditions_extractor import branch_inventory_for_file
+    from symbolic.scheduler import CoverageScheduler
+    inventory = branch_inventory_for_file(filename, options.inventory_cache)
+
 # Load the application
 app = loaderFactory(filename, options.entry)
 if app is None:
@@ -71,7 +103,33 @@ try:
         try:
             # Set up the exploration engine
             invocation = app.createInvocation() if entry_point else [filename]
-            engine = ExplorationEngine(invocation, solver=solver)
+            seeds = None
+            if options.seeds and entry_point:
+                try:
+                    seeds = loadSeeds(options.seeds, invocation)
+                except (OSError, ValueError) as e:
+                    parser.error("--seeds: %s" % e)
+            results = None
+            if options.results_cache and entry_point:
+                results = ResultsStore(options.results_cache, app.getFile(), entry_point,
+                                       functionHash(app.getEntryFunction()))
+            sandbox = None
+            if options.sandbox and entry_point:
+                from symbolic.sandbox import Sandbox
+                sandbox = Sandbox(options.sandbox_timeout, options.sandbox_cpu, options.sandbox_memory << 20)
+            scheduler = CoverageScheduler(inventory, entry_point) if inventory is not None else None
+            coverage = CoverageCollector([filename]) if options.coverage else None
+            limits = None
+            if options.max_expr_depth or options.max_expr_size or options.concretize_nonlinear:
+                limits = ExpressionLimits(options.max_expr_depth, options.max_expr_size,
+                                          options.concretize_nonlinear, options.concretization)
+            engine = ExplorationEngine(invocation, solver=solver, scheduler=scheduler,
+                                       coverage=coverage, limits=limits,
+                                       eager_terms=options.eager_terms,
+                                       portfolio_jobs=options.portfolio_jobs,
+                                       dump_queries=options.dump_queries,
+                                       reuse_pool=options.reuse_pool, seeds=seeds,
+                                       results=results, sandbox=sandbox)
             generatedInputs, returnVals, path = engine.explore(options.max_iters)
 
             # Check the result
@@ -90,8 +148,11 @@ try:
                 logger.error("AssertionError occurred: %s", result)
             else:
                 logger.info("Generated Test Cases:")
-                for i, test_case in enumerate(generatedInputs):
-                    if i < 10:  # Log only the first 10 test cases
+                cases = list(enumerate(generatedInputs))
+                if options.reduce_suite and engine.minimal_inputs is not None:
+                    cases = [cases[i] for i in engine.minimal_inputs]
+                for n, (i, test_case) in enumerate(cases):
+                    if n < 10:  # Log only the first 10 test cases
                         logger.info(f"Test Case {i + 1}: {test_case}")
 
         except ImportError as e: